@@ -0,0 +1,46 @@
+"""Partial indexes for active users / outlets
+
+Revision ID: 048
+Revises: 047
+Create Date: 2026-10-17
+
+The super admin dashboard filters users and outlets by is_active = 1 on
+almost every query (org list counts, platform stats, impersonation lookup).
+Without an index scoped to active rows those are full scans of users/outlets.
+
+These partial indexes use the same `WHERE is_active = 1` predicate the
+queries already use, so the planner can match them directly. is_active stays
+an INTEGER 0/1 flag, consistent with every other soft-delete table.
+
+Role validation is already enforced by the check_role constraint (021).
+"""
+from typing import Sequence, Union
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '048'
+down_revision: Union[str, Sequence[str], None] = '047'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Per-org active user counts + admin lookup for impersonation
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_users_org_role_active
+        ON users (organization_id, role)
+        WHERE is_active = 1
+    """)
+
+    # Per-org active outlet counts
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_outlets_org_active
+        ON outlets (organization_id)
+        WHERE is_active = 1
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_outlets_org_active")
+    op.execute("DROP INDEX IF EXISTS idx_users_org_role_active")
@@ -0,0 +1,70 @@
+"""Key price_history uniqueness on outlet as well as date
+
+Revision ID: 049
+Revises: 048
+Create Date: 2026-10-17
+
+Prices have been per outlet since 012, but databases built from the initial
+schema may still carry the (distributor_product_id, effective_date) unique
+constraint under unique_price_per_date or the default
+price_history_distributor_product_id_effective_date_key. That makes a second
+outlet's upload for the same day fail on every row, and it is not the key
+the vendor upload writes on.
+
+Deployed databases were already fixed by hand (migrate.py /
+fix_constraint.py): the legacy constraints are gone and
+unique_price_per_outlet_product_date covers
+(distributor_product_id, outlet_id, effective_date). This brings every
+other database to the same state, so the upload can write prices with a
+single INSERT ... ON CONFLICT DO UPDATE. Both steps are guarded and are
+no-ops where the fix was already applied. Existing rows are unique on the
+narrower key, so they are unique on the wider one too.
+"""
+from typing import Sequence, Union
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '049'
+down_revision: Union[str, Sequence[str], None] = '048'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_constraint
+                WHERE conname = 'unique_price_per_outlet_product_date'
+            ) THEN
+                ALTER TABLE price_history
+                ADD CONSTRAINT unique_price_per_outlet_product_date
+                UNIQUE (distributor_product_id, outlet_id, effective_date);
+            END IF;
+        END $$;
+    """)
+    op.execute("ALTER TABLE price_history DROP CONSTRAINT IF EXISTS unique_price_per_date")
+    op.execute(
+        "ALTER TABLE price_history "
+        "DROP CONSTRAINT IF EXISTS price_history_distributor_product_id_effective_date_key"
+    )
+
+
+def downgrade() -> None:
+    # Fails if two outlets have a price for the same product and day
+    op.execute("""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_constraint
+                WHERE conname = 'unique_price_per_date'
+            ) THEN
+                ALTER TABLE price_history
+                ADD CONSTRAINT unique_price_per_date
+                UNIQUE (distributor_product_id, effective_date);
+            END IF;
+        END $$;
+    """)
+    op.execute("ALTER TABLE price_history DROP CONSTRAINT IF EXISTS unique_price_per_outlet_product_date")
@@ -0,0 +1,37 @@
+"""Partial index for active vessels by name
+
+Revision ID: 050
+Revises: 049
+Create Date: 2026-10-17
+
+list_vessels filters on organization_id and is_active = 1 and orders by
+name. The existing indexes cover organization_id alone, is_active alone and
+the (organization_id, name) uniqueness key, which also carries inactive rows.
+A partial index on the same predicate lets the default listing read active
+vessels in name order without a separate sort.
+
+vessel_product_capacities already has a (vessel_id, common_product_id)
+index from the unique_vessel_product_capacity constraint (011), so the
+capacity lookup needs nothing new.
+"""
+from typing import Sequence, Union
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '050'
+down_revision: Union[str, Sequence[str], None] = '049'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_vessels_org_active_name
+        ON vessels (organization_id, name)
+        WHERE is_active = 1
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_vessels_org_active_name")
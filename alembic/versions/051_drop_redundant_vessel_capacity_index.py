@@ -0,0 +1,31 @@
+"""Drop the vessel_id-only index on vessel_product_capacities
+
+Revision ID: 051
+Revises: 050
+Create Date: 2026-10-17
+
+unique_vessel_product_capacity (011) is already on
+(vessel_id, common_product_id), in that order, so the capacity lookup by
+vessel and product is a single probe of its index, and lookups by vessel_id
+alone (get_vessel, the list counts) can use its leading column.
+
+That makes idx_vessel_capacities_vessel a duplicate that only adds write
+cost to every capacity insert and update, so drop it.
+"""
+from typing import Sequence, Union
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '051'
+down_revision: Union[str, Sequence[str], None] = '050'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_vessel_capacities_vessel")
+
+
+def downgrade() -> None:
+    op.create_index('idx_vessel_capacities_vessel', 'vessel_product_capacities', ['vessel_id'])
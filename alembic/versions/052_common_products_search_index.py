@@ -0,0 +1,34 @@
+"""Full-text index for common product search
+
+Revision ID: 052
+Revises: 051
+Create Date: 2026-10-17
+
+search_products matched '%term%' with ILIKE against common_name, category
+and subcategory, which no index can serve, so every search read the whole
+organization's catalog. It now matches a 'simple' tsvector over the same
+three columns; this GIN index is on that exact expression so the planner
+can use it.
+"""
+from typing import Sequence, Union
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '052'
+down_revision: Union[str, Sequence[str], None] = '051'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_common_products_fts
+        ON common_products USING GIN (
+            to_tsvector('simple', common_name || ' ' || COALESCE(category, '') || ' ' || COALESCE(subcategory, ''))
+        )
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_common_products_fts")
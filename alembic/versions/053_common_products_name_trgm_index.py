@@ -0,0 +1,34 @@
+"""Trigram index for substring search on common product names
+
+Revision ID: 053
+Revises: 052
+Create Date: 2026-10-17
+
+The full-text index from 052 only matches whole words, so partial input
+like "cuke" still needs common_name ILIKE '%term%'. A pg_trgm GIN index on
+common_name serves those ILIKE patterns (trigrams are case-folded, so no
+lower() is needed) for both search_products and the common products list
+filter.
+"""
+from typing import Sequence, Union
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '053'
+down_revision: Union[str, Sequence[str], None] = '052'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_common_products_name_trgm
+        ON common_products USING GIN (common_name gin_trgm_ops)
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_common_products_name_trgm")
+    # Not dropping the extension; other objects may depend on it
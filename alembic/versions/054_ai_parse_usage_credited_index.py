@@ -0,0 +1,34 @@
+"""Partial index for credited AI parses by organization and month
+
+Revision ID: 054
+Revises: 053
+Create Date: 2026-10-17
+
+check_parse_limit counts an organization's 'success' and 'partial' parses
+since the start of the month on every parse attempt and usage lookup.
+idx_ai_parse_recent_attempts (005) covers (organization_id, created_at) but
+every row it finds still has to be read from the table to test
+parse_status. A partial index with the same keys over only credited parses
+answers the count from the index alone.
+"""
+from typing import Sequence, Union
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '054'
+down_revision: Union[str, Sequence[str], None] = '053'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_ai_parse_credited
+        ON ai_parse_usage (organization_id, created_at)
+        WHERE parse_status IN ('success', 'partial')
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_ai_parse_credited")
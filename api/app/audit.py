@@ -15,7 +15,8 @@ def log_audit(
     changes: Optional[Dict[str, Any]] = None,
     ip_address: Optional[str] = None,
     impersonating: bool = False,
-    original_super_admin_id: Optional[int] = None
+    original_super_admin_id: Optional[int] = None,
+    cursor=None
 ):
     """
     Log an audit event to the audit_logs table.
@@ -30,38 +31,52 @@ def log_audit(
         ip_address: IP address of the requester
         impersonating: Whether this action was performed while impersonating
         original_super_admin_id: If impersonating, the ID of the super admin
+        cursor: The caller's cursor, if it already holds a connection. The
+            row is then written in the caller's transaction (committed with
+            it) instead of on a second pooled connection.
     """
-    try:
-        with get_db() as conn:
-            cursor = conn.cursor()
-
-            # Convert changes dict to JSON string
-            changes_json = json.dumps(changes) if changes else None
+    def insert(cursor):
+        # Convert changes dict to JSON string
+        changes_json = json.dumps(changes) if changes else None
 
-            cursor.execute("""
-                INSERT INTO audit_logs (
-                    user_id,
-                    organization_id,
-                    action,
-                    entity_type,
-                    entity_id,
-                    changes,
-                    ip_address,
-                    impersonating,
-                    original_super_admin_id
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
+        cursor.execute("""
+            INSERT INTO audit_logs (
                 user_id,
                 organization_id,
                 action,
                 entity_type,
                 entity_id,
-                changes_json,
+                changes,
                 ip_address,
-                bool(impersonating),
+                impersonating,
                 original_super_admin_id
-            ))
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, (
+            user_id,
+            organization_id,
+            action,
+            entity_type,
+            entity_id,
+            changes_json,
+            ip_address,
+            bool(impersonating),
+            original_super_admin_id
+        ))
 
+    if cursor is not None:
+        # Savepoint so a failed audit insert doesn't abort the caller's transaction
+        cursor.execute("SAVEPOINT audit_log")
+        try:
+            insert(cursor)
+            cursor.execute("RELEASE SAVEPOINT audit_log")
+        except Exception as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT audit_log")
+            print(f"Warning: Failed to log audit event: {e}")
+        return
+
+    try:
+        with get_db() as conn:
+            insert(conn.cursor())
             conn.commit()
     except Exception as e:
         # Fail gracefully if audit_logs table doesn't exist yet
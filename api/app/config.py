@@ -13,6 +13,12 @@ import os
 DB_MIN_CONNECTIONS = int(os.getenv("DB_MIN_CONNECTIONS", "2"))
 DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "10"))
 
+# Pooled connections idle longer than this are checked with SELECT 1 before use
+DB_POOL_PING_IDLE_SECONDS = int(os.getenv("DB_POOL_PING_IDLE_SECONDS", "300"))
+
+# How long a request waits for a free pooled connection before failing
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+
 
 # =============================================================================
 # Authentication
@@ -36,3 +42,37 @@ MAX_PAGE_LIMIT_LARGE = int(os.getenv("MAX_PAGE_LIMIT_LARGE", "10000"))
 # Banquet Menu Defaults
 # =============================================================================
 DEFAULT_GUEST_COUNT = int(os.getenv("DEFAULT_GUEST_COUNT", "50"))
+
+
+# =============================================================================
+# Vendor Uploads
+# =============================================================================
+# Rows per chunk when streaming large CSV price lists
+UPLOAD_CSV_CHUNK_ROWS = int(os.getenv("UPLOAD_CSV_CHUNK_ROWS", "50000"))
+
+# Uploads larger than this are rejected with 413
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(256 * 1024 * 1024)))
+
+# Uploads larger than this spill from memory to a temp file
+UPLOAD_SPOOL_MAX_MEMORY = int(os.getenv("UPLOAD_SPOOL_MAX_MEMORY", str(16 * 1024 * 1024)))
+
+# Rows per multi-row INSERT statement when importing uploads
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+
+
+# =============================================================================
+# In-Process Read Caches
+# =============================================================================
+# Seconds a cached read (e.g. vessel lists) may be served before refetching
+READ_CACHE_TTL_SECONDS = int(os.getenv("READ_CACHE_TTL_SECONDS", "30"))
+READ_CACHE_MAX_ENTRIES = int(os.getenv("READ_CACHE_MAX_ENTRIES", "2048"))
+
+# The units table only changes through migrations, so it can be held longer
+UNITS_CACHE_TTL_SECONDS = int(os.getenv("UNITS_CACHE_TTL_SECONDS", "300"))
+
+
+# =============================================================================
+# AI Recipe Import
+# =============================================================================
+# Stop reading an uploaded spreadsheet after this many consecutive empty rows
+EXCEL_MAX_EMPTY_ROWS = int(os.getenv("EXCEL_MAX_EMPTY_ROWS", "100"))
@@ -2,6 +2,9 @@
 PostgreSQL database connection with connection pooling.
 """
 import os
+import threading
+import time
+import weakref
 from contextlib import contextmanager
 import psycopg2
 from psycopg2.pool import ThreadedConnectionPool
@@ -14,7 +17,7 @@ if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL environment variable is required")
 
 # Connection pool settings from centralized config
-from .config import DB_MIN_CONNECTIONS, DB_MAX_CONNECTIONS
+from .config import DB_MIN_CONNECTIONS, DB_MAX_CONNECTIONS, DB_POOL_PING_IDLE_SECONDS, DB_POOL_TIMEOUT_SECONDS
 
 # Initialize the connection pool
 _pool = None
@@ -32,6 +35,46 @@ def get_pool():
     return _pool
 
 
+# Sync endpoints run on FastAPI's threadpool, which has more threads than the
+# pool has connections. ThreadedConnectionPool raises as soon as it is empty,
+# so gate checkouts on a semaphore and let extra requests queue for a slot.
+# Only a thread's outermost checkout is gated: helpers such as
+# check_outlet_access open their own connection while the caller still holds
+# one, and waiting for a slot there could stall every request at once.
+# Nested checkouts go straight to the pool, which fails fast when empty.
+_slots = threading.BoundedSemaphore(DB_MAX_CONNECTIONS)
+_held = threading.local()
+
+
+# When each pooled connection was last handed back, for the idle check
+_last_used = weakref.WeakKeyDictionary()
+
+
+def _checkout(pool):
+    """
+    Take a connection from the pool, replacing it if it has gone bad.
+
+    Connections idle for longer than DB_POOL_PING_IDLE_SECONDS are pinged
+    first, since the server or a proxy may have dropped them meanwhile.
+    """
+    conn = pool.getconn()
+    if not conn.closed:
+        idle_since = _last_used.get(conn)
+        if idle_since is None or time.monotonic() - idle_since < DB_POOL_PING_IDLE_SECONDS:
+            return conn
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            pass
+
+    # Broken: discard it and open a fresh one in its place
+    pool.putconn(conn, close=True)
+    return pool.getconn()
+
+
 @contextmanager
 def get_db():
     """
@@ -40,7 +83,18 @@ def get_db():
     Returns a connection with RealDictCursor that returns rows as dictionaries.
     """
     pool = get_pool()
-    conn = pool.getconn()
+    nested = getattr(_held, "depth", 0) > 0
+    if not nested and not _slots.acquire(timeout=DB_POOL_TIMEOUT_SECONDS):
+        raise psycopg2.pool.PoolError(
+            f"No database connection free after {DB_POOL_TIMEOUT_SECONDS}s"
+        )
+    try:
+        conn = _checkout(pool)
+    except Exception:
+        if not nested:
+            _slots.release()
+        raise
+    _held.depth = getattr(_held, "depth", 0) + 1
 
     # Set the cursor factory for this connection
     conn.cursor_factory = RealDictCursor
@@ -49,11 +103,51 @@ def get_db():
         yield conn
     except Exception:
         # Rollback on any error to reset connection state
-        conn.rollback()
+        if not conn.closed:
+            conn.rollback()
         raise
     finally:
-        # Return connection to pool (don't close it)
-        pool.putconn(conn)
+        # Return connection to pool (don't close it unless it has broken)
+        _last_used[conn] = time.monotonic()
+        pool.putconn(conn, close=bool(conn.closed))
+        _held.depth -= 1
+        if not nested:
+            _slots.release()
+
+
+# Names of server-side prepared statements already created on each pooled
+# connection. Prepared statements live for the lifetime of the session, so
+# each pooled connection only pays the parse/plan cost once per statement.
+_prepared_statements = weakref.WeakKeyDictionary()
+
+
+def execute_prepared(cursor, name: str, query: str, params=()):
+    """
+    Execute a hot query through a server-side prepared statement.
+
+    The statement is PREPAREd on first use per connection and EXECUTEd
+    afterwards, skipping the parse/plan stage on repeat calls.
+
+    Args:
+        cursor: Cursor from a get_db() connection
+        name: Statement name (must be unique per query text)
+        query: SQL using $1, $2, ... positional parameters
+        params: Parameter values, in positional order
+
+    Example:
+        execute_prepared(cursor, "user_by_email", "SELECT id FROM users WHERE email = $1", (email,))
+        row = cursor.fetchone()
+    """
+    prepared = _prepared_statements.setdefault(cursor.connection, set())
+    if name not in prepared:
+        cursor.execute(f"PREPARE {name} AS {query}")
+        prepared.add(name)
+
+    if params:
+        placeholders = ", ".join(["%s"] * len(params))
+        cursor.execute(f"EXECUTE {name} ({placeholders})", params)
+    else:
+        cursor.execute(f"EXECUTE {name}")
 
 
 def dict_from_row(row):
@@ -64,5 +158,10 @@ def dict_from_row(row):
 
 
 def dicts_from_rows(rows):
-    """Convert list of database rows to list of dictionaries."""
+    """
+    Convert list of database rows to list of dictionaries.
+
+    get_db() connections already use RealDictCursor, whose rows are dicts;
+    this only copies them. Prefer returning cursor.fetchall() directly.
+    """
     return [dict(row) for row in rows]
@@ -4,9 +4,10 @@ from pathlib import Path
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
 from .routers import products, common_products, distributors, units, recipes, uploads, auth, organizations, outlets, super_admin, ai_parse, banquet_menus, vessels, base_conversions, potentials, chat, taxonomy, ehc, ehc_forms, waste, daily_log
 from .db_startup import initialize_database
+from .config import MAX_UPLOAD_BYTES
 
 app = FastAPI(
     title="RestauranTek API",
@@ -23,6 +24,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+# Refuse oversized uploads from the Content-Length header, before the
+# multipart parser spools the body. Chunked bodies without a length are
+# still capped by the read loop in the upload endpoint.
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    if request.method == "POST" and request.url.path == "/api/uploads/csv":
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > MAX_UPLOAD_BYTES:
+            return JSONResponse(
+                status_code=413,
+                content={"detail": f"Upload too large. Maximum size is {MAX_UPLOAD_BYTES // (1024 * 1024)} MB"}
+            )
+    return await call_next(request)
+
+
 # Initialize database on startup (PostgreSQL with Alembic migrations)
 initialize_database()
 
@@ -191,6 +191,7 @@ class PriceHistory(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     distributor_product_id = Column(Integer, ForeignKey('distributor_products.id', ondelete='CASCADE'), nullable=False)
+    outlet_id = Column(Integer)
     case_price = Column(Float, nullable=False)
     unit_price = Column(Float)
     effective_date = Column(DateTime, nullable=False)
@@ -198,7 +199,7 @@ class PriceHistory(Base):
     created_at = Column(DateTime, server_default=func.now())
 
     __table_args__ = (
-        UniqueConstraint('distributor_product_id', 'effective_date', name='unique_price_per_date'),
+        UniqueConstraint('distributor_product_id', 'outlet_id', 'effective_date', name='unique_price_per_outlet_product_date'),
     )
 
 
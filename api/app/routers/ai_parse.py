@@ -7,14 +7,12 @@ Handles file upload, parsing, and usage statistics for AI-powered recipe import.
 import time
 from typing import List
 from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Request, Form
-from fastapi.responses import JSONResponse
 
 from ..auth import get_current_user
 from ..database import get_db
 from ..schemas import (
     ParseFileResponse,
-    ParsedIngredient,
-    ProductMatch,
+    PARSED_INGREDIENTS_ADAPTER,
     YieldInfo,
     UsageStats,
     UsageStatsResponse,
@@ -23,10 +21,11 @@ from ..schemas import (
     CreateRecipeFromParseRequest,
     CreateRecipeFromParseResponse,
     RecipeMethodStep,
+    METHOD_STEPS_ADAPTER,
 )
-from ..services.file_processor import extract_text_from_file, validate_file_before_parse
+from ..services.file_processor import validate_file_before_parse
 from ..services.recipe_parser import parse_recipe_with_claude, determine_parse_status
-from ..services.product_matcher import match_products
+from ..services.product_matcher import match_products_batch
 from ..services.unit_converter import normalize_quantity
 from ..utils.tier_limits import (
     check_parse_limit,
@@ -186,9 +185,9 @@ async def parse_recipe_file(
                 detail=f"Monthly AI parse limit exceeded ({usage_info['used']}/{usage_info['limit']} used). Upgrade to Basic tier for 100 parses/month.",
             )
 
-        # Pre-validate file
+        # Pre-validate file (also extracts its text)
         try:
-            validation = await validate_file_before_parse(file)
+            validation, text = await validate_file_before_parse(file)
             filename = validation['filename']
             file_type = filename.split('.')[-1].lower()
         except HTTPException as e:
@@ -206,24 +205,6 @@ async def parse_recipe_file(
             )
             raise
 
-        # Extract text from file
-        try:
-            text = await extract_text_from_file(file)
-        except HTTPException as e:
-            # Log extraction failure
-            log_parse_attempt(
-                organization_id=organization_id,
-                user_id=user_id,
-                outlet_id=outlet_id,
-                filename=filename,
-                file_type=file_type,
-                parse_status='failed',
-                conn=conn,
-                error_message=str(e.detail),
-                parse_time_ms=int((time.time() - start_time) * 1000)
-            )
-            raise
-
         # Parse with Claude API
         try:
             recipe_data = await parse_recipe_with_claude(text)
@@ -253,15 +234,16 @@ async def parse_recipe_file(
         parsed_ingredients = []
         ingredients_matched = 0
 
-        for idx, ing_data in enumerate(recipe_data['ingredients']):
+        # Match all ingredients to common products against one catalog load
+        all_matches = match_products_batch(
+            [ing_data['name'] for ing_data in recipe_data['ingredients']],
+            organization_id,
+            conn,
+            max_results=3
+        )
+
+        for idx, (ing_data, matches) in enumerate(zip(recipe_data['ingredients'], all_matches)):
             logger.debug(f"parse: Ingredient {idx + 1}: {ing_data['name']}")
-            # Match to common products
-            matches = match_products(
-                ing_data['name'],
-                organization_id,
-                conn,
-                max_results=3
-            )
 
             # Normalize units
             normalized_qty, normalized_unit, unit_id = normalize_quantity(
@@ -313,7 +295,8 @@ async def parse_recipe_file(
             # Needs review if no auto-match was made
             needs_review = auto_matched_id is None
 
-            parsed_ingredients.append(ParsedIngredient(
+            # Validated as a batch into ParsedIngredient models after the loop
+            parsed_ingredients.append(dict(
                 parsed_name=ing_data['name'],
                 quantity=ing_data['quantity'],
                 unit=ing_data['unit'],
@@ -322,15 +305,15 @@ async def parse_recipe_file(
                 normalized_unit=normalized_unit,
                 normalized_unit_id=unit_id,
                 prep_note=ing_data.get('prep_note'),
-                suggested_products=[
-                    ProductMatch(**match) for match in matches
-                ],
+                suggested_products=matches,
                 needs_review=needs_review,
                 auto_matched_product_id=auto_matched_id,
                 auto_matched_product_name=auto_matched_name,
                 auto_match_type=auto_match_type
             ))
 
+        parsed_ingredients = PARSED_INGREDIENTS_ADAPTER.validate_python(parsed_ingredients)
+
         # Process yield
         yield_info = None
         if recipe_data.get('yield'):
@@ -393,8 +376,10 @@ async def parse_recipe_file(
                     'ingredients_count': total_ingredients,
                     'matched_count': ingredients_matched
                 },
-                ip_address=request.client.host if request else None
+                ip_address=request.client.host if request else None,
+                cursor=cursor
             )
+            conn.commit()
             logger.debug(f"parse: Audit logged successfully")
         except Exception as e:
             logger.error(f"parse: Audit logging failed: {type(e).__name__}: {str(e)}")
@@ -427,7 +412,8 @@ async def parse_recipe_file(
                 category=recipe_data.get('category'),
                 ingredients=parsed_ingredients,
                 method=method_steps,
-                usage=UsageStats(**updated_usage),
+                # Built server-side by check_parse_limit, already typed
+                usage=UsageStats.model_construct(**updated_usage),
                 credits_used=credits_used
             )
             logger.debug(f"parse: Response object created successfully")
@@ -511,10 +497,9 @@ async def create_recipe_from_parse(
             )
 
         # Serialize method steps to JSON if present
-        import json
         method_json = None
         if data.method:
-            method_json = json.dumps([step.dict() for step in data.method])
+            method_json = METHOD_STEPS_ADAPTER.dump_json(data.method).decode()
 
         # Create recipe
         cursor.execute("""
@@ -583,8 +568,6 @@ async def create_recipe_from_parse(
             WHERE id = %s
         """, (recipe_id, data.parse_id))
 
-        conn.commit()
-
         # Log audit event
         log_audit(
             user_id=user_id,
@@ -597,9 +580,12 @@ async def create_recipe_from_parse(
                 'parse_id': data.parse_id,
                 'ingredients_count': len(data.ingredients)
             },
-            ip_address=request.client.host if request else None
+            ip_address=request.client.host if request else None,
+            cursor=cursor
         )
 
+        conn.commit()
+
         return CreateRecipeFromParseResponse(
             recipe_id=recipe_id,
             name=data.name,
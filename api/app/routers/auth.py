@@ -376,13 +376,12 @@ def update_user_outlet_assignments(
             DELETE FROM user_outlets WHERE user_id = %s
         """, (user_id,))
 
-        # Insert new assignments
+        # Insert new assignments in a single statement
         if outlet_ids:
-            values = [(user_id, outlet_id) for outlet_id in outlet_ids]
-            cursor.executemany("""
+            cursor.execute("""
                 INSERT INTO user_outlets (user_id, outlet_id)
-                VALUES (%s, %s)
-            """, values)
+                SELECT %s, unnest(%s::int[])
+            """, (user_id, outlet_ids))
 
         conn.commit()
 
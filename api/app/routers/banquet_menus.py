@@ -8,10 +8,12 @@ from fastapi import APIRouter, HTTPException, Query, Depends
 from pydantic import BaseModel
 from typing import Optional, List
 from decimal import Decimal
+import psycopg2
 from ..database import get_db, dicts_from_rows, dict_from_row
 from ..auth import get_current_user, build_outlet_filter, check_outlet_access
 from ..utils.conversions import get_unit_conversion_factor, get_base_conversion_factor, get_unit_id_from_abbreviation
 from ..config import DEFAULT_GUEST_COUNT
+from ..utils.responses import ORJSONResponse
 
 router = APIRouter(prefix="/banquet-menus", tags=["banquet-menus"])
 
@@ -195,9 +197,9 @@ def list_banquet_menus(
         """
 
         cursor.execute(query, params)
-        menus = dicts_from_rows(cursor.fetchall())
+        menus = cursor.fetchall()
 
-        return {"menus": menus, "total": len(menus)}
+        return ORJSONResponse({"menus": menus, "total": len(menus)})
 
 
 @router.get("/meal-periods")
@@ -707,8 +709,8 @@ def create_banquet_menu(menu: BanquetMenuCreate, current_user: dict = Depends(ge
 
             return {"message": "Menu created successfully", "menu_id": menu_id}
 
-        except Exception as e:
-            if "unique_menu_per_outlet" in str(e):
+        except psycopg2.IntegrityError as e:
+            if e.diag.constraint_name == "unique_menu_per_outlet":
                 raise HTTPException(
                     status_code=400,
                     detail="A menu with this name already exists for this meal period and service type"
@@ -737,7 +739,7 @@ def update_banquet_menu(menu_id: int, updates: BanquetMenuUpdate, current_user:
         update_fields = []
         params = []
 
-        update_dict = updates.dict(exclude_unset=True)
+        update_dict = updates.model_dump(exclude_unset=True)
         for field, value in update_dict.items():
             update_fields.append(f"{field} = %s")
             params.append(value)
@@ -846,7 +848,7 @@ def update_menu_item(item_id: int, updates: MenuItemUpdate, current_user: dict =
         update_fields = []
         params = []
 
-        update_dict = updates.dict(exclude_unset=True)
+        update_dict = updates.model_dump(exclude_unset=True)
         for field, value in update_dict.items():
             if field == "is_enhancement":
                 value = int(value)
@@ -970,7 +972,7 @@ def create_prep_item(item_id: int, prep: PrepItemCreate, current_user: dict = De
 @router.put("/prep/{prep_id}")
 def update_prep_item(prep_id: int, updates: PrepItemUpdate, current_user: dict = Depends(get_current_user)):
     """Update a prep item."""
-    update_dict = updates.dict(exclude_unset=True)
+    update_dict = updates.model_dump(exclude_unset=True)
 
     # Count how many link fields are being set to non-null values
     link_fields = ["product_id", "recipe_id", "common_product_id"]
@@ -12,8 +12,10 @@ and outlets can further customize.
 from fastapi import APIRouter, HTTPException, Depends, Query
 from pydantic import BaseModel
 from typing import Optional, List
+import psycopg2
 from ..database import get_db, dicts_from_rows, dict_from_row
 from ..auth import get_current_user, check_outlet_access
+from ..utils.responses import ORJSONResponse
 
 router = APIRouter(prefix="/base-conversions", tags=["base-conversions"])
 
@@ -126,8 +128,8 @@ def list_base_conversions(
                 tu.abbreviation
         """, params)
 
-        conversions = dicts_from_rows(cursor.fetchall())
-        return {"conversions": conversions, "total": len(conversions)}
+        conversions = cursor.fetchall()
+        return ORJSONResponse({"conversions": conversions, "total": len(conversions)})
 
 
 @router.get("/effective")
@@ -304,8 +306,8 @@ def create_base_conversion(
 
             return {"message": "Conversion created successfully", "conversion_id": conversion_id}
 
-        except Exception as e:
-            if "idx_base_conversions_lookup" in str(e):
+        except psycopg2.IntegrityError as e:
+            if e.diag.constraint_name == "idx_base_conversions_lookup":
                 raise HTTPException(
                     status_code=400,
                     detail="A conversion between these units already exists at this scope"
@@ -355,7 +357,7 @@ def update_base_conversion(
         update_fields = []
         params = []
 
-        update_dict = updates.dict(exclude_unset=True)
+        update_dict = updates.model_dump(exclude_unset=True)
 
         if "conversion_factor" in update_dict:
             if update_dict["conversion_factor"] <= 0:
@@ -500,8 +502,8 @@ def create_reverse_conversion(
                 "conversion_factor": reverse_factor
             }
 
-        except Exception as e:
-            if "idx_base_conversions_lookup" in str(e):
+        except psycopg2.IntegrityError as e:
+            if e.diag.constraint_name == "idx_base_conversions_lookup":
                 raise HTTPException(
                     status_code=400,
                     detail="A reverse conversion already exists at this scope"
@@ -1,12 +1,16 @@
 from fastapi import APIRouter, HTTPException, Query, Depends, Request, Body
 from typing import Optional, List
+import psycopg2
 from ..database import get_db, dicts_from_rows, dict_from_row
 from ..schemas import CommonProduct, CommonProductCreate, CommonProductUpdate, QuickCreateProductRequest, QuickCreateProductResponse, MergeCommonProductsRequest, MergeCommonProductsResponse
+from ..schemas import ALLERGEN_FIELDS, ALLERGEN_FIELD_SET, allergen_flags, allergen_columns
 from ..auth import get_current_user
 from ..audit import log_audit
 from ..config import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT_LARGE
 from ..logger import get_logger
 from ..utils.embeddings import search_similar_products, embed_common_product
+from ..utils.responses import ORJSONResponse
+from ..services.product_matcher import invalidate_products_cache
 import os
 
 logger = get_logger(__name__)
@@ -158,15 +162,7 @@ def list_common_products(
 
         if allergen:
             # Validate allergen field name to prevent SQL injection
-            valid_allergens = [
-                'allergen_vegan', 'allergen_vegetarian', 'allergen_gluten',
-                'allergen_crustation', 'allergen_egg', 'allergen_mollusk',
-                'allergen_fish', 'allergen_lupin', 'allergen_dairy',
-                'allergen_tree_nuts', 'allergen_peanuts', 'allergen_sesame',
-                'allergen_soy', 'allergen_sulphur_dioxide', 'allergen_mustard',
-                'allergen_celery'
-            ]
-            if allergen in valid_allergens:
+            if allergen in ALLERGEN_FIELDS:
                 if include_linked_count:
                     query += f" AND cp.{allergen} = 1"
                 else:
@@ -179,9 +175,7 @@ def list_common_products(
         params.extend([limit, skip])
 
         cursor.execute(query, params)
-        common_products = dicts_from_rows(cursor.fetchall())
-
-        return common_products
+        return ORJSONResponse(cursor.fetchall())
 
 
 @router.get("/{common_product_id}", response_model=CommonProduct)
@@ -217,15 +211,13 @@ def create_common_product(common_product: CommonProductCreate, current_user: dic
                 detail=f"Common product '{common_product.common_name}' already exists in your organization"
             )
 
-        cursor.execute("""
+        allergens = allergen_columns(common_product.allergen_flags)
+        cursor.execute(f"""
             INSERT INTO common_products (
                 common_name, category, subcategory, preferred_unit_id, notes, organization_id,
-                allergen_vegan, allergen_vegetarian, allergen_gluten, allergen_crustation,
-                allergen_egg, allergen_mollusk, allergen_fish, allergen_lupin, allergen_dairy,
-                allergen_tree_nuts, allergen_peanuts, allergen_sesame, allergen_soy,
-                allergen_sulphur_dioxide, allergen_mustard, allergen_celery
+                {', '.join(ALLERGEN_FIELDS)}
             )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            VALUES ({', '.join(['%s'] * (6 + len(ALLERGEN_FIELDS)))})
             RETURNING *
         """, (
             common_product.common_name,
@@ -234,22 +226,7 @@ def create_common_product(common_product: CommonProductCreate, current_user: dic
             common_product.preferred_unit_id,
             common_product.notes,
             organization_id,
-            int(common_product.allergen_vegan),
-            int(common_product.allergen_vegetarian),
-            int(common_product.allergen_gluten),
-            int(common_product.allergen_crustation),
-            int(common_product.allergen_egg),
-            int(common_product.allergen_mollusk),
-            int(common_product.allergen_fish),
-            int(common_product.allergen_lupin),
-            int(common_product.allergen_dairy),
-            int(common_product.allergen_tree_nuts),
-            int(common_product.allergen_peanuts),
-            int(common_product.allergen_sesame),
-            int(common_product.allergen_soy),
-            int(common_product.allergen_sulphur_dioxide),
-            int(common_product.allergen_mustard),
-            int(common_product.allergen_celery)
+            *allergens.values()
         ))
 
         result = dict_from_row(cursor.fetchone())
@@ -262,6 +239,7 @@ def create_common_product(common_product: CommonProductCreate, current_user: dic
                 logger.warning(f"Failed to generate embedding for product {result['id']}: {e}")
 
         conn.commit()
+        invalidate_products_cache(organization_id)
 
         return result
 
@@ -286,7 +264,7 @@ def update_common_product(common_product_id: int, update: CommonProductUpdate, c
             for field, value in update.model_dump(exclude_unset=True).items():
                 update_fields.append(f"{field} = %s")
                 # Convert boolean to integer for allergen fields (PostgreSQL uses integer for boolean)
-                if field.startswith('allergen_') and isinstance(value, bool):
+                if field in ALLERGEN_FIELD_SET and isinstance(value, bool):
                     params.append(int(value))
                 else:
                     params.append(value)
@@ -301,6 +279,7 @@ def update_common_product(common_product_id: int, update: CommonProductUpdate, c
             logger.debug(f" Params: {params}")
             cursor.execute(query, params)
             conn.commit()
+            invalidate_products_cache(current_user["organization_id"])
 
             # Return updated common product
             cursor.execute("SELECT * FROM common_products WHERE id = %s", (common_product_id,))
@@ -329,6 +308,7 @@ def delete_common_product(common_product_id: int, current_user: dict = Depends(g
             raise HTTPException(status_code=404, detail="Common product not found in your organization")
 
         conn.commit()
+        invalidate_products_cache(current_user["organization_id"])
 
         return {"message": "Common product deleted successfully"}
 
@@ -553,8 +533,8 @@ def create_conversion(
             ))
 
             forward_id = dict_from_row(cursor.fetchone())['id']
-        except Exception as e:
-            if 'uq_product_conversion' in str(e):
+        except psycopg2.IntegrityError as e:
+            if e.diag.constraint_name == "uq_product_conversion":
                 raise HTTPException(status_code=400, detail="This conversion already exists")
             raise
 
@@ -792,26 +772,14 @@ def merge_common_products(
             WHERE common_product_id IN ({placeholders})
         """, (request.target_id, *request.source_ids))
 
-        # Merge allergens using OR logic
-        allergen_fields = [
-            'allergen_vegan', 'allergen_vegetarian', 'allergen_gluten',
-            'allergen_crustation', 'allergen_egg', 'allergen_mollusk',
-            'allergen_fish', 'allergen_lupin', 'allergen_dairy',
-            'allergen_tree_nuts', 'allergen_peanuts', 'allergen_sesame',
-            'allergen_soy', 'allergen_sulphur_dioxide', 'allergen_mustard',
-            'allergen_celery'
-        ]
-
-        merged_allergens = {}
-        for field in allergen_fields:
-            # Target starts with its own value, OR with all sources
-            value = target.get(field, 0)
-            for source in sources:
-                value = value or source.get(field, 0)
-            merged_allergens[field] = 1 if value else 0
+        # Merge allergens using OR logic: target flags OR'd with every source
+        flags = allergen_flags(target)
+        for source in sources:
+            flags |= allergen_flags(source)
+        merged_allergens = allergen_columns(flags)
 
         # Update target with merged allergens
-        update_parts = [f"{field} = %s" for field in allergen_fields]
+        update_parts = [f"{field} = %s" for field in ALLERGEN_FIELDS]
         cursor.execute(f"""
             UPDATE common_products
             SET {', '.join(update_parts)}
@@ -826,6 +794,7 @@ def merge_common_products(
         """, request.source_ids)
 
         conn.commit()
+        invalidate_products_cache(organization_id)
 
         # Get updated target
         cursor.execute("SELECT * FROM common_products WHERE id = %s", (request.target_id,))
@@ -913,6 +882,7 @@ def quick_create_common_product(
                     logger.warning(f"quick_create: Failed to generate embedding: {e}")
 
             conn.commit()
+            invalidate_products_cache(organization_id)
             logger.debug(f"quick_create: Committed to database")
 
             # Log audit event
@@ -929,8 +899,10 @@ def quick_create_common_product(
                         'category': product.category,
                         'created_via': 'ai_recipe_parser'
                     },
-                    ip_address=request.client.host if request else None
+                    ip_address=request.client.host if request else None,
+                    cursor=cursor
                 )
+                conn.commit()
                 logger.debug(f"quick_create: Audit logged successfully")
             except Exception as audit_error:
                 logger.error(f"quick_create: Audit logging failed: {type(audit_error).__name__}: {str(audit_error)}")
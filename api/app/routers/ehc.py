@@ -546,7 +546,7 @@ def update_cycle(
             raise HTTPException(status_code=404, detail="Cycle not found")
 
         # Build update
-        update_dict = updates.dict(exclude_unset=True)
+        update_dict = updates.model_dump(exclude_unset=True)
         if not update_dict:
             return {"status": "ok", "message": "No fields to update"}
 
@@ -931,7 +931,7 @@ def update_point(
             raise HTTPException(status_code=404, detail="Audit point not found")
 
         # Build update
-        update_dict = updates.dict(exclude_unset=True)
+        update_dict = updates.model_dump(exclude_unset=True)
         if not update_dict:
             return {"status": "ok", "message": "No fields to update"}
 
@@ -1168,7 +1168,7 @@ def update_record(
             raise HTTPException(status_code=404, detail="Record not found")
 
         # Build update
-        update_dict = updates.dict(exclude_unset=True)
+        update_dict = updates.model_dump(exclude_unset=True)
         if not update_dict:
             return {"status": "ok", "message": "No fields to update"}
 
@@ -1474,7 +1474,7 @@ def update_submission(
             raise HTTPException(status_code=404, detail="Submission not found")
 
         # Build update
-        update_dict = updates.dict(exclude_unset=True)
+        update_dict = updates.model_dump(exclude_unset=True)
         if not update_dict:
             return {"status": "ok", "message": "No fields to update"}
 
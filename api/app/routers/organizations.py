@@ -9,6 +9,7 @@ from ..database import get_db, dict_from_row, dicts_from_rows
 from ..schemas import OrganizationCreate, OrganizationUpdate, OrganizationResponse
 from ..auth import get_current_user, require_admin
 from ..logger import get_logger
+from ..utils.tier_limits import invalidate_tier_cache
 
 logger = get_logger(__name__)
 
@@ -64,8 +65,16 @@ def get_my_organization_stats(current_user: dict = Depends(get_current_user)):
     with get_db() as conn:
         cursor = conn.cursor()
 
-        # Get organization
-        cursor.execute("SELECT * FROM organizations WHERE id = %s", (org_id,))
+        # Get organization and its counts in one round trip
+        cursor.execute("""
+            SELECT
+                o.*,
+                (SELECT COUNT(*) FROM users WHERE organization_id = o.id) AS stats_user_count,
+                (SELECT COUNT(*) FROM recipes WHERE organization_id = o.id AND is_active = 1) AS stats_recipe_count,
+                (SELECT COUNT(*) FROM products WHERE organization_id = o.id AND is_active = 1) AS stats_product_count
+            FROM organizations o
+            WHERE o.id = %s
+        """, (org_id,))
         org = dict_from_row(cursor.fetchone())
 
         if not org:
@@ -74,15 +83,9 @@ def get_my_organization_stats(current_user: dict = Depends(get_current_user)):
                 detail="Organization not found"
             )
 
-        # Get counts
-        cursor.execute("SELECT COUNT(*) as count FROM users WHERE organization_id = %s", (org_id,))
-        user_count = cursor.fetchone()["count"]
-
-        cursor.execute("SELECT COUNT(*) as count FROM recipes WHERE organization_id = %s AND is_active = 1", (org_id,))
-        recipe_count = cursor.fetchone()["count"]
-
-        cursor.execute("SELECT COUNT(*) as count FROM products WHERE organization_id = %s AND is_active = 1", (org_id,))
-        product_count = cursor.fetchone()["count"]
+        user_count = org['stats_user_count']
+        recipe_count = org['stats_recipe_count']
+        product_count = org['stats_product_count']
 
         return {
             "organization_id": org_id,
@@ -337,6 +340,7 @@ def update_organization(
         query = f"UPDATE organizations SET {', '.join(update_fields)} WHERE id = %s"
         cursor.execute(query, params)
         conn.commit()
+        invalidate_tier_cache(org_id)
 
         # Return updated organization
         cursor.execute("SELECT * FROM organizations WHERE id = %s", (org_id,))
@@ -385,8 +389,16 @@ def get_organization_stats(
     with get_db() as conn:
         cursor = conn.cursor()
 
-        # Get organization
-        cursor.execute("SELECT * FROM organizations WHERE id = %s", (org_id,))
+        # Get organization and its counts in one round trip
+        cursor.execute("""
+            SELECT
+                o.*,
+                (SELECT COUNT(*) FROM users WHERE organization_id = o.id) AS stats_user_count,
+                (SELECT COUNT(*) FROM recipes WHERE organization_id = o.id) AS stats_recipe_count,
+                (SELECT COUNT(DISTINCT distributor_id) FROM distributor_products WHERE organization_id = o.id) AS stats_distributor_count
+            FROM organizations o
+            WHERE o.id = %s
+        """, (org_id,))
         org = dict_from_row(cursor.fetchone())
 
         if not org:
@@ -395,15 +407,9 @@ def get_organization_stats(
                 detail="Organization not found"
             )
 
-        # Get counts
-        cursor.execute("SELECT COUNT(*) FROM users WHERE organization_id = %s", (org_id,))
-        user_count = cursor.fetchone()[0]
-
-        cursor.execute("SELECT COUNT(*) FROM recipes WHERE organization_id = %s", (org_id,))
-        recipe_count = cursor.fetchone()[0]
-
-        cursor.execute("SELECT COUNT(*) FROM distributors WHERE organization_id = %s", (org_id,))
-        distributor_count = cursor.fetchone()[0]
+        user_count = org['stats_user_count']
+        recipe_count = org['stats_recipe_count']
+        distributor_count = org['stats_distributor_count']
 
         return {
             "organization_id": org_id,
@@ -362,7 +362,7 @@ def update_event(event_id: int, updates: EventUpdate, current_user: dict = Depen
             raise HTTPException(status_code=404, detail="Event not found")
 
         # Build update
-        update_dict = updates.dict(exclude_unset=True)
+        update_dict = updates.model_dump(exclude_unset=True)
         if not update_dict:
             return {"status": "ok", "message": "No fields to update"}
 
@@ -543,28 +543,35 @@ async def upload_hitlist(file: UploadFile = File(...), current_user: dict = Depe
         fb_categories = {"breakfast", "lunch", "dinner", "reception"}
         events_to_process = []
 
-        for _, row in df.iterrows():
+        # Plain tuples instead of iterrows(), which builds a Series per row
+        col_idx = {c: i for i, c in enumerate(df.columns)}
+
+        def get(row, name, default=None):
+            i = col_idx.get(name)
+            return row[i] if i is not None else default
+
+        for row in df.itertuples(index=False, name=None):
             # Skip cancelled or invalid events
-            if row.get("DISTRO?") == "CXLD" or row.get("EV_STATUS") == "CAN":
+            if get(row, "DISTRO?") == "CXLD" or get(row, "EV_STATUS") == "CAN":
                 continue
-            if pd.isna(row.get("EVENT_ID")):
+            if pd.isna(get(row, "EVENT_ID")):
                 continue
 
-            category = categorize_event_type(row.get("EV_TYPE"))
+            category = categorize_event_type(get(row, "EV_TYPE"))
             if category not in fb_categories:
                 continue
 
             events_to_process.append({
-                "event_id": int(row["EVENT_ID"]),
-                "date": row["event_date"].strftime("%Y-%m-%d") if pd.notna(row["event_date"]) else None,
-                "booking_name": str(row["BOOKING_NAME"]) if pd.notna(row.get("BOOKING_NAME")) else "Unknown",
-                "event_name": str(row["EV_NAME"]) if pd.notna(row.get("EV_NAME")) else "",
-                "event_type": str(row["EV_TYPE"]) if pd.notna(row.get("EV_TYPE")) else "",
+                "event_id": int(get(row, "EVENT_ID")),
+                "date": get(row, "event_date").strftime("%Y-%m-%d") if pd.notna(get(row, "event_date")) else None,
+                "booking_name": str(get(row, "BOOKING_NAME")) if pd.notna(get(row, "BOOKING_NAME")) else "Unknown",
+                "event_name": str(get(row, "EV_NAME")) if pd.notna(get(row, "EV_NAME")) else "",
+                "event_type": str(get(row, "EV_TYPE")) if pd.notna(get(row, "EV_TYPE")) else "",
                 "category": category,
-                "venue": str(row["FUNC_SPACE"]) if pd.notna(row.get("FUNC_SPACE")) else "",
-                "time": str(row["TIME"]) if pd.notna(row.get("TIME")) else "",
-                "attendees": int(row["ATTENDEES"]) if pd.notna(row.get("ATTENDEES")) else 0,
-                "gtd": int(row["GTD"]) if pd.notna(row.get("GTD")) else 0,
+                "venue": str(get(row, "FUNC_SPACE")) if pd.notna(get(row, "FUNC_SPACE")) else "",
+                "time": str(get(row, "TIME")) if pd.notna(get(row, "TIME")) else "",
+                "attendees": int(get(row, "ATTENDEES")) if pd.notna(get(row, "ATTENDEES")) else 0,
+                "gtd": int(get(row, "GTD")) if pd.notna(get(row, "GTD")) else 0,
             })
 
         # Delete dataframe to free memory
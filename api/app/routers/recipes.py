@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException, Query, Depends
 from typing import Optional
 from ..database import get_db, dicts_from_rows, dict_from_row
-from ..schemas import Recipe, RecipeCreate, RecipeWithIngredients, RecipeWithCost
+from ..schemas import Recipe, RecipeCreate, RecipeWithIngredients, RecipeWithCost, Allergen, allergen_flags, METHOD_STEPS_ADAPTER
 from ..auth import get_current_user, build_outlet_filter, check_outlet_access
 from ..utils.conversions import get_unit_conversion_factor
 from ..config import DEFAULT_PAGE_LIMIT_LARGE, MAX_PAGE_LIMIT_LARGE
@@ -195,7 +195,7 @@ def create_recipe(recipe: RecipeCreate, outlet_id: Optional[int] = None, current
                 raise HTTPException(status_code=403, detail="You don't have access to this outlet")
 
         # Serialize method to JSON
-        method_json = json.dumps([step.dict() for step in recipe.method]) if recipe.method else None
+        method_json = METHOD_STEPS_ADAPTER.dump_json(recipe.method).decode() if recipe.method else None
 
         cursor.execute("""
             INSERT INTO recipes (
@@ -224,13 +224,14 @@ def create_recipe(recipe: RecipeCreate, outlet_id: Optional[int] = None, current
         for ingredient in recipe.ingredients:
             cursor.execute("""
                 INSERT INTO recipe_ingredients (
-                    recipe_id, common_product_id, sub_recipe_id,
+                    recipe_id, common_product_id, sub_recipe_id, ingredient_name,
                     quantity, unit_id, yield_percentage, notes
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s)
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
             """, (
                 recipe_id,
                 ingredient.common_product_id,
                 ingredient.sub_recipe_id,
+                ingredient.ingredient_name,
                 ingredient.quantity,
                 ingredient.unit_id,
                 ingredient.yield_percentage,
@@ -764,19 +765,33 @@ ALLERGEN_FIELDS = [
     'allergen_lupin', 'allergen_sulphur_dioxide', 'allergen_vegan', 'allergen_vegetarian'
 ]
 
+# (bit, display name) for the allergens proper, in display order; vegan and
+# vegetarian are dietary flags handled separately. Built once at import.
+_ALLERGEN_LABELS = tuple(
+    (Allergen[field[len('allergen_'):].upper()], field.replace('allergen_', '').replace('_', ' ').title())
+    for field in ALLERGEN_FIELDS
+    if field not in ('allergen_vegan', 'allergen_vegetarian')
+)
+_DIETARY_FLAGS = Allergen.VEGAN | Allergen.VEGETARIAN
 
-def _calculate_recipe_allergens(cursor, recipe_id: int, visited: set) -> dict:
+
+def _allergen_names(flags: int) -> list:
+    """Display names of the allergen bits set in flags."""
+    return [name for bit, name in _ALLERGEN_LABELS if flags & bit]
+
+
+def _recipe_allergen_flags(cursor, recipe_id: int, visited: set) -> tuple:
     """
-    Calculate allergens for a recipe from all its ingredients.
+    Allergen bitmask for a recipe and its per-ingredient breakdown.
 
-    Returns a dict with:
-    - contains: list of allergens present in any ingredient
-    - vegan: True if all ingredients are vegan-flagged
-    - vegetarian: True if all ingredients are vegetarian-flagged
-    - by_ingredient: list of which ingredients have which allergens
+    Allergen bits are OR'd across all ingredients (recursing into
+    sub-recipes); the VEGAN/VEGETARIAN bits stay set only if every product
+    and sub-recipe ingredient has them.
+
+    Returns (flags, by_ingredient).
     """
     if recipe_id in visited:
-        return {"contains": [], "vegan": False, "vegetarian": False, "by_ingredient": []}
+        return 0, []
     visited.add(recipe_id)
 
     # Get all ingredients with their common product allergens
@@ -795,75 +810,62 @@ def _calculate_recipe_allergens(cursor, recipe_id: int, visited: set) -> dict:
         WHERE ri.recipe_id = %s
     """, (recipe_id,))
 
-    ingredients = dicts_from_rows(cursor.fetchall())
+    ingredients = cursor.fetchall()
 
-    # Track allergens across all ingredients
-    all_allergens = set()
-    all_vegan = True
-    all_vegetarian = True
+    # If no ingredients, dietary status is unknown
+    if not ingredients:
+        return 0, []
+
+    contains = 0
+    dietary = _DIETARY_FLAGS
     by_ingredient = []
-    has_ingredients = False
 
     for ing in ingredients:
-        has_ingredients = True
-        ing_allergens = []
-        ing_vegan = False
-        ing_vegetarian = False
-
-        if ing.get('common_product_id'):
-            # Check allergens from common product
-            for field in ALLERGEN_FIELDS:
-                if field in ['allergen_vegan', 'allergen_vegetarian']:
-                    continue  # Handle dietary flags separately
-                if ing.get(field):
-                    allergen_name = field.replace('allergen_', '').replace('_', ' ').title()
-                    ing_allergens.append(allergen_name)
-                    all_allergens.add(allergen_name)
-
-            ing_vegan = bool(ing.get('allergen_vegan'))
-            ing_vegetarian = bool(ing.get('allergen_vegetarian'))
-
-            if not ing_vegan:
-                all_vegan = False
-            if not ing_vegetarian:
-                all_vegetarian = False
-
+        if ing['common_product_id']:
+            ing_flags = allergen_flags(ing)
             by_ingredient.append({
                 "ingredient_id": ing['id'],
                 "name": ing['common_name'],
-                "allergens": ing_allergens,
-                "vegan": ing_vegan,
-                "vegetarian": ing_vegetarian
+                "allergens": _allergen_names(ing_flags),
+                "vegan": bool(ing_flags & Allergen.VEGAN),
+                "vegetarian": bool(ing_flags & Allergen.VEGETARIAN)
             })
-
-        elif ing.get('sub_recipe_id'):
+        elif ing['sub_recipe_id']:
             # Recursively get allergens from sub-recipe
-            sub_allergens = _calculate_recipe_allergens(cursor, ing['sub_recipe_id'], visited.copy())
-
-            all_allergens.update(sub_allergens.get('contains', []))
-            if not sub_allergens.get('vegan', False):
-                all_vegan = False
-            if not sub_allergens.get('vegetarian', False):
-                all_vegetarian = False
-
+            ing_flags, _ = _recipe_allergen_flags(cursor, ing['sub_recipe_id'], visited.copy())
             by_ingredient.append({
                 "ingredient_id": ing['id'],
                 "name": ing['sub_recipe_name'],
                 "is_sub_recipe": True,
-                "allergens": sub_allergens.get('contains', []),
-                "vegan": sub_allergens.get('vegan', False),
-                "vegetarian": sub_allergens.get('vegetarian', False)
+                "allergens": sorted(_allergen_names(ing_flags)),
+                "vegan": bool(ing_flags & Allergen.VEGAN),
+                "vegetarian": bool(ing_flags & Allergen.VEGETARIAN)
             })
+        else:
+            # Text-only ingredients carry no allergen data
+            continue
 
-    # If no ingredients, dietary status is unknown
-    if not has_ingredients:
-        all_vegan = False
-        all_vegetarian = False
+        contains |= ing_flags & ~_DIETARY_FLAGS
+        dietary &= ing_flags
+
+    return contains | dietary, by_ingredient
+
+
+def _calculate_recipe_allergens(cursor, recipe_id: int, visited: set) -> dict:
+    """
+    Calculate allergens for a recipe from all its ingredients.
 
+    Returns a dict with:
+    - contains: list of allergens present in any ingredient
+    - vegan: True if all ingredients are vegan-flagged
+    - vegetarian: True if all ingredients are vegetarian-flagged
+    - by_ingredient: list of which ingredients have which allergens
+    """
+    flags, by_ingredient = _recipe_allergen_flags(cursor, recipe_id, visited)
     return {
-        "contains": sorted(list(all_allergens)),
-        "vegan": all_vegan,
-        "vegetarian": all_vegetarian,
+        "contains": sorted(_allergen_names(flags)),
+        "vegan": bool(flags & Allergen.VEGAN),
+        "vegetarian": bool(flags & Allergen.VEGETARIAN),
         "by_ingredient": by_ingredient
     }
 
@@ -1,14 +1,19 @@
 """
 Super Admin router - Platform owner dashboard for managing all organizations.
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+import base64
+import json
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime, timedelta
+import psycopg2
 
 from ..auth import get_current_super_admin, get_current_user, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES, Token, get_password_hash
-from ..database import get_db, dict_from_row
+from ..database import get_db, dict_from_row, execute_prepared
 from ..audit import log_audit, AuditAction, EntityType
+from ..utils.ndjson import wants_ndjson, ndjson_response
+from ..utils.tier_limits import invalidate_tier_cache
 
 
 router = APIRouter(prefix="/super-admin", tags=["super-admin"])
@@ -110,6 +115,29 @@ class OrganizationDetailResponse(BaseModel):
     recipes_count: int
     users: List[UserResponse]
     outlets: List[OutletBasic]
+    users_truncated: bool = False
+    outlets_truncated: bool = False
+    users_next_cursor: Optional[str] = None
+    outlets_next_cursor: Optional[str] = None
+
+
+def _encode_cursor(*sort_key) -> str:
+    """Encode the sort key of the last returned row as an opaque cursor."""
+    return base64.urlsafe_b64encode(json.dumps(sort_key).encode()).decode()
+
+
+def _decode_cursor(cursor_str: str, size: int) -> list:
+    """Decode a cursor produced by _encode_cursor, expecting `size` key parts."""
+    try:
+        sort_key = json.loads(base64.urlsafe_b64decode(cursor_str.encode()))
+        if isinstance(sort_key, list) and len(sort_key) == size:
+            return sort_key
+    except (ValueError, TypeError):
+        pass
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid pagination cursor"
+    )
 
 
 # Organizations endpoints
@@ -120,51 +148,44 @@ def list_all_organizations(
     tier: Optional[str] = None,
     status_filter: Optional[str] = None,
     search: Optional[str] = None,
-    current_user: dict = Depends(get_current_super_admin)
+    current_user: dict = Depends(get_current_super_admin),
+    request: Request = None
 ):
-    """List all organizations with stats (super admin only)."""
-    with get_db() as conn:
-        cursor = conn.cursor()
-
-        # Build query with filters
-        where_clauses = []
-        params = []
-
-        if tier:
-            where_clauses.append("o.subscription_tier = %s")
-            params.append(tier)
-
-        if status_filter:
-            where_clauses.append("o.subscription_status = %s")
-            params.append(status_filter)
-
-        if search:
-            where_clauses.append("o.name ILIKE %s")
-            params.append(f"%{search}%")
-
-        where_clause = " AND ".join(where_clauses) if where_clauses else "1=1"
+    """
+    List all organizations with stats (super admin only).
 
-        # Get organizations with counts
-        query = f"""
-            SELECT
-                o.*,
-                COUNT(DISTINCT u.id) as users_count,
-                COUNT(DISTINCT ot.id) as outlets_count,
-                COUNT(DISTINCT p.id) as products_count,
-                COUNT(DISTINCT r.id) as recipes_count
-            FROM organizations o
-            LEFT JOIN users u ON u.organization_id = o.id AND u.is_active = 1
-            LEFT JOIN outlets ot ON ot.organization_id = o.id AND ot.is_active = 1
-            LEFT JOIN products p ON p.organization_id = o.id AND p.is_active = 1
-            LEFT JOIN recipes r ON r.organization_id = o.id AND r.is_active = 1
-            WHERE {where_clause}
-            GROUP BY o.id
-            ORDER BY o.created_at DESC
-            LIMIT %s OFFSET %s
-        """
+    Send `Accept: application/x-ndjson` to stream large pages as NDJSON.
+    """
+    # Fixed-shape query: every filter is always present and disabled by a
+    # NULL parameter, so the statement text never changes and the
+    # prepared plan is reused across filter combinations.
+    def execute(cursor):
+        execute_prepared(cursor, "sa_list_organizations", """
+                SELECT
+                    o.*,
+                    COUNT(DISTINCT u.id) as users_count,
+                    COUNT(DISTINCT ot.id) as outlets_count,
+                    COUNT(DISTINCT p.id) as products_count,
+                    COUNT(DISTINCT r.id) as recipes_count
+                FROM organizations o
+                LEFT JOIN users u ON u.organization_id = o.id AND u.is_active = 1
+                LEFT JOIN outlets ot ON ot.organization_id = o.id AND ot.is_active = 1
+                LEFT JOIN products p ON p.organization_id = o.id AND p.is_active = 1
+                LEFT JOIN recipes r ON r.organization_id = o.id AND r.is_active = 1
+                WHERE ($1::text IS NULL OR o.subscription_tier = $1)
+                  AND ($2::text IS NULL OR o.subscription_status = $2)
+                  AND ($3::text IS NULL OR o.name ILIKE $3)
+                GROUP BY o.id
+                ORDER BY o.created_at DESC
+                LIMIT $4 OFFSET $5
+            """, (tier or None, status_filter or None, f"%{search}%" if search else None, limit, skip))
+
+    if wants_ndjson(request):
+        return ndjson_response(execute)
 
-        params.extend([limit, skip])
-        cursor.execute(query, params)
+    with get_db() as conn:
+        cursor = conn.cursor()
+        execute(cursor)
 
         organizations = [dict_from_row(row) for row in cursor.fetchall()]
         return organizations
@@ -173,9 +194,21 @@ def list_all_organizations(
 @router.get("/organizations/{org_id}", response_model=OrganizationDetailResponse)
 def get_organization_detail(
     org_id: int,
+    users_limit: int = Query(200, ge=1, le=1000),
+    outlets_limit: int = Query(200, ge=1, le=1000),
+    users_cursor: Optional[str] = None,
+    outlets_cursor: Optional[str] = None,
     current_user: dict = Depends(get_current_super_admin)
 ):
-    """Get detailed organization information with users and outlets (super admin only)."""
+    """
+    Get detailed organization information with users and outlets (super admin only).
+
+    The users and outlets lists are capped (users_limit / outlets_limit) so
+    the response stays bounded for large tenants. When a list is cut off,
+    *_truncated is true and *_next_cursor can be passed back as
+    users_cursor / outlets_cursor to fetch the next page. Full exports
+    should use the paginated GET /super-admin/users endpoint.
+    """
     with get_db() as conn:
         cursor = conn.cursor()
 
@@ -205,21 +238,43 @@ def get_organization_detail(
 
         org_dict = dict_from_row(org)
 
-        # Get all users for this organization
-        cursor.execute("""
-            SELECT id, email, username, full_name, role, is_active, organization_id, last_login
+        # Get a page of users, keyset-paginated on (is_active DESC, role, email).
+        # One extra row is fetched to detect truncation. is_active is nullable,
+        # so it is read, sorted and compared as COALESCE(is_active, 0); a NULL
+        # in the cursor would otherwise match no rows and end pagination.
+        user_keyset = ""
+        params = [org_id]
+        if users_cursor:
+            is_active, role, email = _decode_cursor(users_cursor, 3)
+            user_keyset = (
+                "AND (COALESCE(is_active, 0) < %s"
+                " OR (COALESCE(is_active, 0) = %s AND (role, email) > (%s, %s)))"
+            )
+            params.extend([is_active, is_active, role, email])
+        params.append(users_limit + 1)
+
+        cursor.execute(f"""
+            SELECT id, email, username, full_name, role, COALESCE(is_active, 0) AS is_active,
+                   organization_id, last_login
             FROM users
-            WHERE organization_id = %s
-            ORDER BY is_active DESC, role, email
-        """, (org_id,))
+            WHERE organization_id = %s {user_keyset}
+            ORDER BY COALESCE(is_active, 0) DESC, role, email
+            LIMIT %s
+        """, params)
         users = [dict_from_row(row) for row in cursor.fetchall()]
 
-        # Get outlet assignments for all users
+        org_dict["users_truncated"] = len(users) > users_limit
+        users = users[:users_limit]
+        if org_dict["users_truncated"]:
+            last = users[-1]
+            org_dict["users_next_cursor"] = _encode_cursor(last["is_active"], last["role"], last["email"])
+
+        # Get outlet assignments for the returned users only
         cursor.execute("""
             SELECT user_id, outlet_id
             FROM user_outlets
-            WHERE user_id IN (SELECT id FROM users WHERE organization_id = %s)
-        """, (org_id,))
+            WHERE user_id = ANY(%s)
+        """, ([user["id"] for user in users],))
 
         # Build a map of user_id -> [outlet_ids]
         outlet_assignments = {}
@@ -233,15 +288,35 @@ def get_organization_detail(
         for user in users:
             user["assigned_outlet_ids"] = outlet_assignments.get(user["id"], [])
 
-        # Get all outlets for this organization
-        cursor.execute("""
-            SELECT id, name, location, is_active
+        # Get a page of outlets, keyset-paginated on (is_active DESC, name, id).
+        # Outlet names aren't unique within an org, so id breaks ties between
+        # same-named outlets on either side of a page boundary.
+        outlet_keyset = ""
+        params = [org_id]
+        if outlets_cursor:
+            is_active, name, outlet_id = _decode_cursor(outlets_cursor, 3)
+            outlet_keyset = (
+                "AND (COALESCE(is_active, 0) < %s"
+                " OR (COALESCE(is_active, 0) = %s AND (name, id) > (%s, %s)))"
+            )
+            params.extend([is_active, is_active, name, outlet_id])
+        params.append(outlets_limit + 1)
+
+        cursor.execute(f"""
+            SELECT id, name, location, COALESCE(is_active, 0) AS is_active
             FROM outlets
-            WHERE organization_id = %s
-            ORDER BY is_active DESC, name
-        """, (org_id,))
+            WHERE organization_id = %s {outlet_keyset}
+            ORDER BY COALESCE(is_active, 0) DESC, name, id
+            LIMIT %s
+        """, params)
         outlets = [dict_from_row(row) for row in cursor.fetchall()]
 
+        org_dict["outlets_truncated"] = len(outlets) > outlets_limit
+        outlets = outlets[:outlets_limit]
+        if org_dict["outlets_truncated"]:
+            last = outlets[-1]
+            org_dict["outlets_next_cursor"] = _encode_cursor(last["is_active"], last["name"], last["id"])
+
         org_dict['users'] = users
         org_dict['outlets'] = outlets
 
@@ -303,18 +378,6 @@ def update_organization(
     with get_db() as conn:
         cursor = conn.cursor()
 
-        # Check organization exists and get current values
-        cursor.execute("SELECT * FROM organizations WHERE id = %s", (org_id,))
-        old_org = dict_from_row(cursor.fetchone())
-        if not old_org:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Organization not found"
-            )
-
-        # Track changes for audit log
-        changes = {}
-
         # Build update query
         update_fields = []
         params = []
@@ -322,27 +385,22 @@ def update_organization(
         if org_update.name is not None:
             update_fields.append("name = %s")
             params.append(org_update.name)
-            changes["name"] = {"from": old_org["name"], "to": org_update.name}
 
         if org_update.subscription_tier is not None:
             update_fields.append("subscription_tier = %s")
             params.append(org_update.subscription_tier)
-            changes["subscription_tier"] = {"from": old_org["subscription_tier"], "to": org_update.subscription_tier}
 
         if org_update.subscription_status is not None:
             update_fields.append("subscription_status = %s")
             params.append(org_update.subscription_status)
-            changes["subscription_status"] = {"from": old_org["subscription_status"], "to": org_update.subscription_status}
 
         if org_update.max_users is not None:
             update_fields.append("max_users = %s")
             params.append(org_update.max_users)
-            changes["max_users"] = {"from": old_org["max_users"], "to": org_update.max_users}
 
         if org_update.max_recipes is not None:
             update_fields.append("max_recipes = %s")
             params.append(org_update.max_recipes)
-            changes["max_recipes"] = {"from": old_org["max_recipes"], "to": org_update.max_recipes}
 
         if not update_fields:
             raise HTTPException(
@@ -353,16 +411,30 @@ def update_organization(
         update_fields.append("updated_at = NOW()")
         params.append(org_id)
 
+        # Existence check is fused into the UPDATE: no row back means 404.
+        # The locked pre-update row is returned alongside for the audit diff.
         query = f"""
-            UPDATE organizations
+            UPDATE organizations o
             SET {', '.join(update_fields)}
-            WHERE id = %s
-            RETURNING *
+            FROM (SELECT * FROM organizations WHERE id = %s FOR UPDATE) old
+            WHERE o.id = old.id
+            RETURNING o.*, to_jsonb(old) AS old_values
         """
 
         cursor.execute(query, params)
         updated_org = dict_from_row(cursor.fetchone())
-        conn.commit()
+        if not updated_org:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Organization not found"
+            )
+
+        # Track changes for audit log
+        old_org = updated_org.pop("old_values")
+        changes = {
+            field: {"from": old_org[field], "to": value}
+            for field, value in org_update.model_dump(exclude_none=True).items()
+        }
 
         # Log audit event
         action = AuditAction.SUBSCRIPTION_UPDATED if "subscription_tier" in changes or "subscription_status" in changes else AuditAction.ORG_UPDATED
@@ -375,8 +447,11 @@ def update_organization(
             changes=changes,
             ip_address=request.client.host if request else None,
             impersonating=current_user.get("impersonating", False),
-            original_super_admin_id=current_user.get("original_super_admin_id")
+            original_super_admin_id=current_user.get("original_super_admin_id"),
+            cursor=cursor
         )
+        conn.commit()
+        invalidate_tier_cache(org_id)
 
         # Add counts
         cursor.execute("""
@@ -436,7 +511,7 @@ def create_user_for_organization(
         cursor = conn.cursor()
 
         # Verify organization exists
-        cursor.execute("SELECT id FROM organizations WHERE id = %s", (org_id,))
+        execute_prepared(cursor, "sa_org_exists", "SELECT id FROM organizations WHERE id = $1", (org_id,))
         if not cursor.fetchone():
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -444,7 +519,7 @@ def create_user_for_organization(
             )
 
         # Check if email already exists
-        cursor.execute("SELECT id FROM users WHERE email = %s", (user.email,))
+        execute_prepared(cursor, "sa_user_by_email", "SELECT id FROM users WHERE email = $1", (user.email,))
         if cursor.fetchone():
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -452,7 +527,7 @@ def create_user_for_organization(
             )
 
         # Check if username already exists
-        cursor.execute("SELECT id FROM users WHERE username = %s", (user.username,))
+        execute_prepared(cursor, "sa_user_by_username", "SELECT id FROM users WHERE username = $1", (user.username,))
         if cursor.fetchone():
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -485,15 +560,6 @@ def update_user(
     with get_db() as conn:
         cursor = conn.cursor()
 
-        # Verify user exists
-        cursor.execute("SELECT id, organization_id FROM users WHERE id = %s", (user_id,))
-        existing_user = cursor.fetchone()
-        if not existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-
         # Build update query dynamically based on provided fields
         update_fields = []
         params = []
@@ -503,12 +569,7 @@ def update_user(
             params.append(user_update.full_name)
 
         if user_update.role is not None:
-            # Validate role
-            if user_update.role not in ['admin', 'chef', 'viewer', 'foh_manager']:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Invalid role. Must be 'admin', 'chef', 'viewer', or 'foh_manager'"
-                )
+            # Role is validated by the check_role constraint on users
             update_fields.append("role = %s")
             params.append(user_update.role)
 
@@ -539,9 +600,23 @@ def update_user(
             WHERE id = %s
             RETURNING id, email, username, full_name, role, is_active, organization_id
         """
-        cursor.execute(query, params)
+        try:
+            cursor.execute(query, params)
+        except psycopg2.IntegrityError as e:
+            if e.diag.constraint_name == "check_role":
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid role. Must be 'admin', 'chef', 'viewer', or 'foh_manager'"
+                )
+            raise
 
+        # No row back means the user doesn't exist
         updated_user = dict_from_row(cursor.fetchone())
+        if not updated_user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
         conn.commit()
 
         return updated_user
@@ -597,13 +672,12 @@ def update_user_outlet_assignments(
             DELETE FROM user_outlets WHERE user_id = %s
         """, (user_id,))
 
-        # Insert new assignments
+        # Insert new assignments in a single statement
         if assignments.outlet_ids:
-            values = [(user_id, outlet_id) for outlet_id in assignments.outlet_ids]
-            cursor.executemany("""
+            cursor.execute("""
                 INSERT INTO user_outlets (user_id, outlet_id)
-                VALUES (%s, %s)
-            """, values)
+                SELECT %s, unnest(%s::int[])
+            """, (user_id, assignments.outlet_ids))
 
         conn.commit()
 
@@ -623,41 +697,32 @@ def get_platform_stats(
     with get_db() as conn:
         cursor = conn.cursor()
 
-        # Total organizations
-        cursor.execute("SELECT COUNT(*) as count FROM organizations")
-        total_orgs = cursor.fetchone()["count"]
-
-        # Total users
-        cursor.execute("SELECT COUNT(*) as count FROM users WHERE is_active = 1")
-        total_users = cursor.fetchone()["count"]
-
-        # Total outlets
-        cursor.execute("SELECT COUNT(*) as count FROM outlets WHERE is_active = 1")
-        total_outlets = cursor.fetchone()["count"]
-
-        # Total products
-        cursor.execute("SELECT COUNT(*) as count FROM products WHERE is_active = 1")
-        total_products = cursor.fetchone()["count"]
-
-        # Total recipes
-        cursor.execute("SELECT COUNT(*) as count FROM recipes WHERE is_active = 1")
-        total_recipes = cursor.fetchone()["count"]
-
-        # Organizations by tier
-        cursor.execute("""
-            SELECT subscription_tier, COUNT(*) as count
-            FROM organizations
-            GROUP BY subscription_tier
-        """)
-        orgs_by_tier = {row["subscription_tier"]: row["count"] for row in cursor.fetchall()}
-
-        # Active vs inactive orgs
-        cursor.execute("""
-            SELECT subscription_status, COUNT(*) as count
-            FROM organizations
-            GROUP BY subscription_status
+        # All platform counts in one round trip so the dashboard poll holds
+        # a worker thread + pooled connection for a single statement.
+        # json_object_agg rejects NULL keys, so unset tiers/statuses are
+        # reported as 'unknown'.
+        execute_prepared(cursor, "sa_platform_stats", """
+            SELECT
+                (SELECT COUNT(*) FROM organizations) as total_orgs,
+                (SELECT COUNT(*) FROM users WHERE is_active = 1) as total_users,
+                (SELECT COUNT(*) FROM outlets WHERE is_active = 1) as total_outlets,
+                (SELECT COUNT(*) FROM products WHERE is_active = 1) as total_products,
+                (SELECT COUNT(*) FROM recipes WHERE is_active = 1) as total_recipes,
+                (SELECT COALESCE(json_object_agg(tier, count), '{}')
+                 FROM (SELECT COALESCE(subscription_tier, 'unknown') as tier, COUNT(*) as count
+                       FROM organizations GROUP BY 1) t) as orgs_by_tier,
+                (SELECT COALESCE(json_object_agg(status, count), '{}')
+                 FROM (SELECT COALESCE(subscription_status, 'unknown') as status, COUNT(*) as count
+                       FROM organizations GROUP BY 1) s) as status_counts
         """)
-        status_counts = {row["subscription_status"]: row["count"] for row in cursor.fetchall()}
+        stats = cursor.fetchone()
+        total_orgs = stats["total_orgs"]
+        total_users = stats["total_users"]
+        total_outlets = stats["total_outlets"]
+        total_products = stats["total_products"]
+        total_recipes = stats["total_recipes"]
+        orgs_by_tier = stats["orgs_by_tier"]
+        status_counts = stats["status_counts"]
 
         return {
             "total_organizations": total_orgs,
@@ -678,39 +743,48 @@ def list_all_users(
     limit: int = 100,
     org_id: Optional[int] = None,
     search: Optional[str] = None,
-    current_user: dict = Depends(get_current_super_admin)
+    current_user: dict = Depends(get_current_super_admin),
+    request: Request = None
 ):
-    """List all users across all organizations (super admin only)."""
-    with get_db() as conn:
-        cursor = conn.cursor()
+    """
+    List all users across all organizations (super admin only).
 
-        where_clauses = ["u.is_active = 1"]
-        params = []
+    Send `Accept: application/x-ndjson` to stream large pages as NDJSON.
+    """
+    where_clauses = ["u.is_active = 1"]
+    params = []
 
-        if org_id:
-            where_clauses.append("u.organization_id = %s")
-            params.append(org_id)
+    if org_id:
+        where_clauses.append("u.organization_id = %s")
+        params.append(org_id)
 
-        if search:
-            where_clauses.append("(u.email ILIKE %s OR u.username ILIKE %s OR u.full_name ILIKE %s)")
-            search_term = f"%{search}%"
-            params.extend([search_term, search_term, search_term])
+    if search:
+        where_clauses.append("(u.email ILIKE %s OR u.username ILIKE %s OR u.full_name ILIKE %s)")
+        search_term = f"%{search}%"
+        params.extend([search_term, search_term, search_term])
+
+    where_clause = " AND ".join(where_clauses)
+    params.extend([limit, skip])
+
+    query = f"""
+        SELECT
+            u.id, u.email, u.username, u.full_name, u.role, u.is_active,
+            u.organization_id, u.created_at, u.last_login,
+            o.name as organization_name,
+            o.subscription_tier
+        FROM users u
+        JOIN organizations o ON o.id = u.organization_id
+        WHERE {where_clause}
+        ORDER BY u.created_at DESC
+        LIMIT %s OFFSET %s
+    """
 
-        where_clause = " AND ".join(where_clauses)
-        params.extend([limit, skip])
+    if wants_ndjson(request):
+        return ndjson_response(lambda cursor: cursor.execute(query, params), server_side=True)
 
-        cursor.execute(f"""
-            SELECT
-                u.id, u.email, u.username, u.full_name, u.role, u.is_active,
-                u.organization_id, u.created_at, u.last_login,
-                o.name as organization_name,
-                o.subscription_tier
-            FROM users u
-            JOIN organizations o ON o.id = u.organization_id
-            WHERE {where_clause}
-            ORDER BY u.created_at DESC
-            LIMIT %s OFFSET %s
-        """, params)
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
 
         users = [dict_from_row(row) for row in cursor.fetchall()]
         return users
@@ -772,8 +846,10 @@ def impersonate_organization(
                 "organization": org["name"],
                 "impersonated_user": admin_user["email"]
             },
-            ip_address=request.client.host if request else None
+            ip_address=request.client.host if request else None,
+            cursor=cursor
         )
+        conn.commit()
 
         # Create impersonation token
         # Include both impersonated user info and original super admin ID
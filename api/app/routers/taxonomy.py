@@ -17,12 +17,14 @@ from ..database import get_db, dicts_from_rows, dict_from_row
 from ..schemas import (
     BaseIngredient, BaseIngredientCreate, BaseIngredientUpdate,
     IngredientVariant, IngredientVariantCreate, IngredientVariantUpdate,
-    BaseIngredientWithVariants, VariantMergeRequest, VariantMergeResponse
+    BaseIngredientWithVariants, VariantMergeRequest, VariantMergeResponse,
+    ALLERGEN_FIELD_SET
 )
 from ..auth import get_current_user
 from ..audit import log_audit
 from ..config import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT_LARGE
 from ..logger import get_logger
+from ..services.product_matcher import invalidate_products_cache
 
 # Add scripts directory to path for parser import
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..', 'scripts'))
@@ -55,6 +57,9 @@ logger = get_logger(__name__)
 
 router = APIRouter(prefix="/taxonomy", tags=["taxonomy"])
 
+# Boolean fields stored as INTEGER 0/1 columns
+_INT_FLAG_FIELDS = ALLERGEN_FIELD_SET | {"is_active"}
+
 
 # =============================================================================
 # Request/Response Models for Common Product Updates
@@ -305,9 +310,9 @@ def create_base_ingredient(
             int(data.allergen_celery)
         ))
         row = cursor.fetchone()
-        log_audit(cursor, "base_ingredient_created", "base_ingredient", row["id"],
-                  current_user["id"], current_user["organization_id"],
-                  {"name": data.name})
+        log_audit("base_ingredient_created", current_user["id"], current_user["organization_id"],
+                  "base_ingredient", row["id"],
+                  {"name": data.name}, cursor=cursor)
         conn.commit()
 
         logger.info(f"Created base ingredient: {data.name} (id={row['id']})")
@@ -334,9 +339,7 @@ def update_base_ingredient(
         updates = []
         params = []
         for field, value in data.model_dump(exclude_unset=True).items():
-            if field.startswith("allergen_") and value is not None:
-                value = int(value)
-            elif field == "is_active" and value is not None:
+            if field in _INT_FLAG_FIELDS and value is not None:
                 value = int(value)
             updates.append(f"{field} = %s")
             params.append(value)
@@ -352,9 +355,9 @@ def update_base_ingredient(
         row = cursor.fetchone()
         conn.commit()
 
-        log_audit(cursor, "base_ingredient_updated", "base_ingredient", base_id,
-                  current_user["id"], current_user["organization_id"],
-                  data.model_dump(exclude_unset=True))
+        log_audit("base_ingredient_updated", current_user["id"], current_user["organization_id"],
+                  "base_ingredient", base_id,
+                  data.model_dump(exclude_unset=True), cursor=cursor)
         conn.commit()
 
         return dict_from_row(row)
@@ -379,8 +382,9 @@ def delete_base_ingredient(base_id: int, current_user: dict = Depends(get_curren
             raise HTTPException(status_code=400, detail="Cannot delete: base ingredient has active variants. Delete them first.")
 
         cursor.execute("UPDATE base_ingredients SET is_active = 0 WHERE id = %s", (base_id,))
-        log_audit(cursor, "base_ingredient_deleted", "base_ingredient", base_id,
-                  current_user["id"], current_user["organization_id"], {"name": row["name"]})
+        log_audit("base_ingredient_deleted", current_user["id"], current_user["organization_id"],
+                  "base_ingredient", base_id,
+                  {"name": row["name"]}, cursor=cursor)
         conn.commit()
         return {"message": f"Base ingredient '{row['name']}' deleted"}
 
@@ -657,9 +661,9 @@ def create_variant(
         row = cursor.fetchone()
         conn.commit()
 
-        log_audit(cursor, "variant_created", "ingredient_variant", row["id"],
-                  current_user["id"], current_user["organization_id"],
-                  {"display_name": data.display_name, "base_ingredient_id": data.base_ingredient_id})
+        log_audit("variant_created", current_user["id"], current_user["organization_id"],
+                  "ingredient_variant", row["id"],
+                  {"display_name": data.display_name, "base_ingredient_id": data.base_ingredient_id}, cursor=cursor)
         conn.commit()
 
         logger.info(f"Created variant: {data.display_name} (id={row['id']})")
@@ -702,9 +706,9 @@ def update_variant(
         row = cursor.fetchone()
         conn.commit()
 
-        log_audit(cursor, "variant_updated", "ingredient_variant", variant_id,
-                  current_user["id"], current_user["organization_id"],
-                  data.model_dump(exclude_unset=True))
+        log_audit("variant_updated", current_user["id"], current_user["organization_id"],
+                  "ingredient_variant", variant_id,
+                  data.model_dump(exclude_unset=True), cursor=cursor)
         conn.commit()
 
         return dict_from_row(row)
@@ -736,8 +740,9 @@ def delete_variant(variant_id: int, current_user: dict = Depends(get_current_use
             raise HTTPException(status_code=400, detail="Cannot delete: variant has active common products. Delete them first.")
 
         cursor.execute("UPDATE ingredient_variants SET is_active = 0 WHERE id = %s", (variant_id,))
-        log_audit(cursor, "variant_deleted", "ingredient_variant", variant_id,
-                  current_user["id"], current_user["organization_id"], {"display_name": row["display_name"]})
+        log_audit("variant_deleted", current_user["id"], current_user["organization_id"],
+                  "ingredient_variant", variant_id,
+                  {"display_name": row["display_name"]}, cursor=cursor)
         conn.commit()
         return {"message": f"Variant '{row['display_name']}' deleted"}
 
@@ -831,9 +836,9 @@ def move_variant(
 
         conn.commit()
 
-        log_audit(cursor, "variant_moved", "ingredient_variant", variant_id,
-                  current_user["id"], current_user["organization_id"],
-                  {"old_parent_id": variant["parent_variant_id"], "new_parent_id": new_parent_id})
+        log_audit("variant_moved", current_user["id"], current_user["organization_id"],
+                  "ingredient_variant", variant_id,
+                  {"old_parent_id": variant["parent_variant_id"], "new_parent_id": new_parent_id}, cursor=cursor)
         conn.commit()
 
         return {
@@ -864,9 +869,11 @@ def delete_common_product(cp_id: int, current_user: dict = Depends(get_current_u
             raise HTTPException(status_code=404, detail="Common product not found")
 
         cursor.execute("UPDATE common_products SET is_active = 0 WHERE id = %s", (cp_id,))
-        log_audit(cursor, "common_product_deleted", "common_product", cp_id,
-                  current_user["id"], org_id, {"common_name": row["common_name"]})
+        log_audit("common_product_deleted", current_user["id"], org_id,
+                  "common_product", cp_id,
+                  {"common_name": row["common_name"]}, cursor=cursor)
         conn.commit()
+        invalidate_products_cache(org_id)
         return {"message": f"Common product '{row['common_name']}' deleted"}
 
 class CPMoveRequest(BaseModel):
@@ -902,11 +909,11 @@ def move_common_product(cp_id: int, data: CPMoveRequest, current_user: dict = De
                WHERE id = %s""",
             (data.variant_id, target["base_ingredient_id"], cp_id)
         )
-        log_audit(cursor, "common_product_moved", "common_product", cp_id,
-                  current_user["id"], org_id,
+        log_audit("common_product_moved", current_user["id"], org_id,
+                  "common_product", cp_id,
                   {"common_name": cp["common_name"],
                    "from_variant_id": cp["variant_id"],
-                   "to_variant_id": data.variant_id})
+                   "to_variant_id": data.variant_id}, cursor=cursor)
         conn.commit()
         return {"id": cp_id, "common_name": cp["common_name"], "variant_id": data.variant_id}
 
@@ -1018,12 +1025,13 @@ def update_and_reparse_common_product(
                 WHERE id = %s
             """, (data.common_name, variant_id, base_id, cp_id))
             conn.commit()
+            invalidate_products_cache(current_user["organization_id"])
 
             moved = old_variant_id != variant_id
 
-            log_audit(cursor, "common_product_reparsed", "common_product", cp_id,
-                      current_user["id"], current_user["organization_id"],
-                      {"old_variant_id": old_variant_id, "new_variant_id": variant_id, "new_name": data.common_name})
+            log_audit("common_product_reparsed", current_user["id"], current_user["organization_id"],
+                      "common_product", cp_id,
+                      {"old_variant_id": old_variant_id, "new_variant_id": variant_id, "new_name": data.common_name}, cursor=cursor)
             conn.commit()
 
             return CommonProductReparseResponse(
@@ -1150,9 +1158,9 @@ def reassign_product(
         """, (data.common_product_id, product_id))
         conn.commit()
 
-        log_audit(cursor, "product_reassigned", "product", product_id,
-                  current_user["id"], org_id,
-                  {"old_common_product_id": old_cp_id, "new_common_product_id": data.common_product_id})
+        log_audit("product_reassigned", current_user["id"], org_id,
+                  "product", product_id,
+                  {"old_common_product_id": old_cp_id, "new_common_product_id": data.common_product_id}, cursor=cursor)
         conn.commit()
 
         logger.info(f"Reassigned product {product_id} from CP {old_cp_id} to CP {data.common_product_id}")
@@ -1266,13 +1274,13 @@ def merge_variants(
         conn.commit()
 
         # Audit log
-        log_audit(cursor, "variants_merged", "ingredient_variant", data.keep_variant_id,
-                  current_user["id"], current_user["organization_id"],
+        log_audit("variants_merged", current_user["id"], current_user["organization_id"],
+                  "ingredient_variant", data.keep_variant_id,
                   {
                       "merged_variant_ids": data.merge_variant_ids,
                       "products_updated": products_updated,
                       "mappings_updated": mappings_updated
-                  })
+                  }, cursor=cursor)
         conn.commit()
 
         logger.info(f"Merged {merged_count} variants into {data.keep_variant_id}, "
@@ -1547,8 +1555,9 @@ def create_in_path(
                 (data.name.strip().title(),)
             )
             row = cursor.fetchone()
-            log_audit(cursor, "base_ingredient_created", "base_ingredient", row["id"],
-                      current_user["id"], org_id, {"name": data.name})
+            log_audit("base_ingredient_created", current_user["id"], org_id,
+                      "base_ingredient", row["id"],
+                      {"name": data.name}, cursor=cursor)
             conn.commit()
             return {**dict_from_row(row), "object_type": "base_ingredient"}
 
@@ -1584,9 +1593,9 @@ def create_in_path(
                 (base_id, data.name.strip(), parent_variant_id, variant_depth)
             )
             row = cursor.fetchone()
-            log_audit(cursor, "variant_created", "ingredient_variant", row["id"],
-                      current_user["id"], org_id,
-                      {"display_name": data.name, "path": data.path})
+            log_audit("variant_created", current_user["id"], org_id,
+                      "ingredient_variant", row["id"],
+                      {"display_name": data.name, "path": data.path}, cursor=cursor)
             conn.commit()
             return {**dict_from_row(row), "object_type": "variant"}
 
@@ -1614,10 +1623,11 @@ def create_in_path(
                 (data.name.strip(), org_id, variant_id, base_id)
             )
             row = cursor.fetchone()
-            log_audit(cursor, "common_product_created", "common_product", row["id"],
-                      current_user["id"], org_id,
-                      {"common_name": data.name, "path": data.path, "variant_id": variant_id})
+            log_audit("common_product_created", current_user["id"], org_id,
+                      "common_product", row["id"],
+                      {"common_name": data.name, "path": data.path, "variant_id": variant_id}, cursor=cursor)
             conn.commit()
+            invalidate_products_cache(org_id)
             return {**dict_from_row(row), "object_type": "common_product"}
 
         else:
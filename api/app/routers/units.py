@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Query
 from typing import Optional
-from ..database import get_db, dicts_from_rows
+from ..database import get_db, dicts_from_rows, execute_prepared
 from ..schemas import Unit
 
 router = APIRouter(prefix="/units", tags=["units"])
@@ -11,7 +11,7 @@ def list_units():
     """List all units of measure."""
     with get_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM units ORDER BY name")
+        execute_prepared(cursor, "units_list", "SELECT * FROM units ORDER BY name")
         units = dicts_from_rows(cursor.fetchall())
         return units
 
@@ -6,14 +6,21 @@ from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime, date
+import asyncio
 import pandas as pd
-import io
+import numpy as np
+from pandas.api.types import is_numeric_dtype
 import uuid
 import re
+import tempfile
+import time
+from psycopg2.extras import execute_values
 
-from ..database import get_db
+from ..database import get_db, dicts_from_rows
+from ..config import UPLOAD_CSV_CHUNK_ROWS, UPLOAD_SPOOL_MAX_MEMORY, IMPORT_BATCH_SIZE, MAX_UPLOAD_BYTES, UNITS_CACHE_TTL_SECONDS
 from ..auth import get_current_user, check_outlet_access, get_user_outlet_ids
 from ..logger import get_logger
+from ..utils.cache import TTLCache
 
 logger = get_logger(__name__)
 
@@ -32,6 +39,7 @@ VENDOR_CONFIGS = {
         ],
         "unit_replacements": {"#": "LB"},
         "calculate_unit_price": True,
+        "non_empty_keys": ['Desc', 'SUPC'],  # Rows missing all of these are blank
     },
     "vesta": {
         "header_row": 10,  # Vesta has 10 header rows before data
@@ -43,6 +51,7 @@ VENDOR_CONFIGS = {
             'BU': 'BUNCH',
         },
         "calculate_unit_price": False,
+        "non_empty_keys": ['Produce Description', 'Prod Number'],
         "parse_packaging": True,  # Vesta needs packaging column parsed
         "column_renames": {
             'Produce Description': 'Desc',
@@ -55,6 +64,7 @@ VENDOR_CONFIGS = {
         "columns_to_drop": [],
         "unit_replacements": {},
         "calculate_unit_price": False,
+        "non_empty_keys": ['Desc', 'SUPC'],
     },
     "shamrock": {
         "header_row": 3,
@@ -66,6 +76,7 @@ VENDOR_CONFIGS = {
             'PK': 'PACK',
         },
         "calculate_unit_price": False,
+        "non_empty_keys": ['Description', 'Product #'],
         "parse_shamrock_packaging": True,  # Parse Pack Size column
         "column_renames": {
             'Product #': 'SUPC',
@@ -79,15 +90,44 @@ VENDOR_CONFIGS = {
         "columns_to_drop": [],
         "unit_replacements": {},
         "calculate_unit_price": False,
+        "non_empty_keys": ['Desc', 'SUPC'],
     },
     "sterling": {
         "header_row": 0,
         "columns_to_drop": [],
         "unit_replacements": {},
         "calculate_unit_price": False,
+        "non_empty_keys": ['Desc', 'SUPC'],
     },
 }
 
+def _usecols_excluding(columns):
+    """Build a read_csv/read_excel usecols filter that skips `columns`."""
+    drop = frozenset(columns)
+    return lambda col: col not in drop
+
+
+# Derived per-vendor lookups, computed once at import instead of per upload
+for _config in VENDOR_CONFIGS.values():
+    _config["_unit_items"] = tuple(_config["unit_replacements"].items())
+    _config["_column_renames"] = _config.get("column_renames", {})
+    _config["_drop_set"] = frozenset(_config["columns_to_drop"])
+    # Projection pushdown: skip dropped columns while parsing instead of
+    # materializing them and dropping afterwards. Not possible when the real
+    # column names only appear in the first data row (Shamrock).
+    if _config["columns_to_drop"] and not _config.get("skip_first_data_row"):
+        _config["_read_usecols"] = _usecols_excluding(_config["columns_to_drop"])
+    else:
+        _config["_read_usecols"] = None
+
+# Uploads are read from the client in pieces this size
+UPLOAD_READ_CHUNK_BYTES = 1024 * 1024
+
+# Precompiled patterns used while cleaning
+_SIZE_RE = re.compile(r'([\d.]+)')
+_NON_NUMERIC_RE = re.compile(r'[^0-9.\-]')
+_DOLLAR_COMMA = str.maketrans('', '', '$,')
+
 
 class UploadResult(BaseModel):
     """Response model for upload results."""
@@ -101,23 +141,37 @@ class UploadResult(BaseModel):
     errors: list[str] = []
 
 
+_DISTRIBUTOR_LIST_TTL = 60  # seconds
+_distributor_list_cache: Optional[tuple[float, list[dict]]] = None
+
+
 @router.get("/distributors")
 def get_upload_distributors():
     """
     Get list of distributors for the upload form.
     Public endpoint - no auth required.
+    Cached for a minute since the distributor list rarely changes.
     """
-    from ..database import dicts_from_rows
+    global _distributor_list_cache
+    now = time.monotonic()
+    if _distributor_list_cache and now - _distributor_list_cache[0] < _DISTRIBUTOR_LIST_TTL:
+        return _distributor_list_cache[1]
+
     with get_db() as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT id, name, code FROM distributors WHERE is_active = 1 ORDER BY name")
         distributors = dicts_from_rows(cursor.fetchall())
-        return distributors
+
+    _distributor_list_cache = (now, distributors)
+    return distributors
 
 
-def parse_vesta_packaging(value):
+def parse_vesta_packaging(packaging: pd.Series) -> pd.DataFrame:
     """
-    Parse Vesta packaging value into pack, size, and unit.
+    Parse a Vesta packaging column into Pack, Size, and Unit columns.
+
+    Vectorized: the whole column is split and converted with pandas string
+    ops and NumPy selects instead of a Python call per row.
 
     Examples:
         '4/5 LB' -> (4, 5.0, 'LB')
@@ -125,44 +179,42 @@ def parse_vesta_packaging(value):
         '8/24 CT' -> (8, 24.0, 'CT')
         'LB' -> (1, None, 'LB')
     """
-    if pd.isna(value) or str(value).strip() == '':
-        return (None, None, None)
-
-    value = str(value).strip()
-
-    # Split by last space
-    if ' ' in value:
-        amount_part, unit = value.rsplit(' ', 1)
-        unit = unit.upper()
-    else:
-        return (1, None, value.upper())
-
-    # Parse amount_part
-    if '/' in amount_part:
-        parts = amount_part.split('/')
-        try:
-            first_num = float(parts[0])
-            second_num = float(parts[1])
-
-            # If unit is CT and first number > 20, treat as range
-            is_range = (unit == 'CT' and first_num > 20)
-
-            if is_range:
-                pack = 1
-                size = (first_num + second_num) / 2
-            else:
-                pack = int(first_num)
-                size = second_num
-        except ValueError:
-            return (1, None, unit)
-    else:
-        try:
-            pack = 1
-            size = float(amount_part)
-        except ValueError:
-            return (1, None, unit)
-
-    return (pack, size, unit)
+    text = packaging.astype(str).str.strip()
+    missing = (packaging.isna() | text.eq('')).to_numpy()
+
+    # Split by last space into amount and unit
+    split = text.str.rsplit(' ', n=1, expand=True).reindex(columns=[0, 1])
+    has_space = split[1].notna().to_numpy()
+    amount = split[0].astype(str)
+    unit = split[1].astype(object).where(has_space, text).str.upper()
+
+    # Parse amount: 'first/second' or a single number
+    has_slash = amount.str.contains('/', regex=False).to_numpy()
+    parts = amount.str.split('/', n=2, expand=True).reindex(columns=[0, 1])
+    first = pd.to_numeric(parts[0].str.strip(), errors='coerce').to_numpy(dtype=float)
+    second = pd.to_numeric(parts[1].str.strip(), errors='coerce').to_numpy(dtype=float)
+    whole = pd.to_numeric(amount.str.strip(), errors='coerce').to_numpy(dtype=float)
+
+    slash_ok = has_slash & ~np.isnan(first) & ~np.isnan(second)
+    # If unit is CT and first number > 20, treat as range
+    is_range = slash_ok & unit.eq('CT').to_numpy() & (first > 20)
+
+    pack = np.select(
+        [missing, ~has_space, is_range, slash_ok],
+        [np.nan, 1, 1, np.trunc(first)],
+        default=1,
+    )
+    size = np.select(
+        [missing, ~has_space, is_range, slash_ok, has_slash],
+        [np.nan, np.nan, (first + second) / 2, second, np.nan],
+        default=whole,
+    )
+
+    return pd.DataFrame({
+        'Pack': pack,
+        'Size': size,
+        'Unit': unit.where(~missing, None),
+    }, index=packaging.index)
 
 
 def parse_shamrock_packaging(value):
@@ -198,7 +250,7 @@ def parse_shamrock_packaging(value):
         size_part = parts[1]
         unit_part = parts[2] if len(parts) > 2 else ''
 
-        size_match = re.match(r'([\d.]+)', size_part)
+        size_match = _SIZE_RE.match(size_part)
         if size_match:
             size = float(size_match.group(1))
             remaining = size_part[size_match.end():]
@@ -216,7 +268,7 @@ def parse_shamrock_packaging(value):
     elif len(parts) == 2:
         try:
             pack = int(parts[0])
-            size_match = re.match(r'([\d.]+)', parts[1])
+            size_match = _SIZE_RE.match(parts[1])
             if size_match:
                 size = float(size_match.group(1))
                 unit = parts[1][size_match.end():].strip() or 'EA'
@@ -244,8 +296,13 @@ def clean_dataframe(df: pd.DataFrame, vendor_code: str) -> pd.DataFrame:
         df.columns = new_columns
         df = df.iloc[1:].reset_index(drop=True)
 
-    # Remove empty rows
-    df = df.dropna(how='all')
+    # Remove empty rows. Checking the identifying columns is enough and far
+    # cheaper than scanning every cell.
+    key_cols = [col for col in config["non_empty_keys"] if col in df.columns]
+    if key_cols:
+        df = df[df[key_cols].notna().any(axis=1)]
+    else:
+        df = df.dropna(how='all')
 
     # Drop rows without Description (for Shamrock)
     if 'Description' in df.columns:
@@ -257,10 +314,8 @@ def clean_dataframe(df: pd.DataFrame, vendor_code: str) -> pd.DataFrame:
         if 'Produce Description' in df.columns:
             df = df.dropna(subset=['Produce Description'])
 
-        parsed = df['Packaging'].apply(parse_vesta_packaging)
-        df['Pack'] = parsed.apply(lambda x: x[0])
-        df['Size'] = parsed.apply(lambda x: x[1])
-        df['Unit'] = parsed.apply(lambda x: x[2])
+        parsed = parse_vesta_packaging(df['Packaging'])
+        df[['Pack', 'Size', 'Unit']] = parsed
         df = df.drop(columns=['Packaging'])
 
         # Apply unit replacements for special cases (HG -> GAL with size adjustment)
@@ -273,83 +328,525 @@ def clean_dataframe(df: pd.DataFrame, vendor_code: str) -> pd.DataFrame:
     # Parse Shamrock Pack Size column
     if config.get("parse_shamrock_packaging") and 'Pack Size' in df.columns:
         parsed = df['Pack Size'].apply(parse_shamrock_packaging)
-        df['Pack'] = parsed.apply(lambda x: x[0])
-        df['Size'] = parsed.apply(lambda x: x[1])
-        df['Unit'] = parsed.apply(lambda x: x[2])
-        df['is_catch_weight'] = parsed.apply(lambda x: x[3])
+        df[['Pack', 'Size', 'Unit', 'is_catch_weight']] = pd.DataFrame(
+            parsed.tolist(), columns=['Pack', 'Size', 'Unit', 'is_catch_weight'], index=df.index
+        )
         df = df.drop(columns=['Pack Size'])
 
     # Rename columns if specified
-    if config.get("column_renames"):
-        df = df.rename(columns=config["column_renames"])
+    if config["_column_renames"]:
+        df = df.rename(columns=config["_column_renames"])
 
     # Drop specified columns
-    columns_to_drop = [col for col in config["columns_to_drop"] if col in df.columns]
+    columns_to_drop = config["_drop_set"].intersection(df.columns)
     if columns_to_drop:
-        df = df.drop(columns=columns_to_drop)
+        df = df.drop(columns=list(columns_to_drop))
 
     # Clean price column with $ signs
     if config.get("price_column_has_dollar") and 'Case $' in df.columns:
-        df['Case $'] = df['Case $'].astype(str).str.replace('$', '', regex=False).str.replace(',', '', regex=False)
-        df['Case $'] = pd.to_numeric(df['Case $'], errors='coerce')
+        df['Case $'] = pd.to_numeric(df['Case $'].astype(str).str.translate(_DOLLAR_COMMA), errors='coerce')
 
     # Clean Unit column
     if 'Unit' in df.columns:
         df['Unit'] = df['Unit'].astype(str)
-        for old, new in config["unit_replacements"].items():
+        for old, new in config["_unit_items"]:
             df['Unit'] = df['Unit'].str.replace(old, new, regex=False)
         df['Unit'] = df['Unit'].str.upper()
 
     # Clean Size column - remove non-numeric characters (for non-Vesta/Shamrock vendors)
     if 'Size' in df.columns and not config.get("parse_packaging") and not config.get("parse_shamrock_packaging"):
-        df['Size'] = df['Size'].astype(str).str.replace(r'[^0-9.\-]', '', regex=True)
+        df['Size'] = df['Size'].astype(str).str.replace(_NON_NUMERIC_RE, '', regex=True)
         df['Size'] = pd.to_numeric(df['Size'], errors='coerce')
 
     # Calculate Unit $ if needed
     if config.get("calculate_unit_price"):
         required_cols = ['Case $', 'Pack', 'Size']
         if all(col in df.columns for col in required_cols):
-            df['Case $'] = pd.to_numeric(df['Case $'], errors='coerce')
-            df['Pack'] = pd.to_numeric(df['Pack'], errors='coerce')
-            df['Size'] = pd.to_numeric(df['Size'], errors='coerce')
+            # Columns already coerced above (e.g. Size, or Case $ when it had
+            # dollar signs) don't need another full conversion pass
+            for col in required_cols:
+                if not is_numeric_dtype(df[col]):
+                    df[col] = pd.to_numeric(df[col], errors='coerce')
             df['Unit $'] = (df['Case $'] / (df['Pack'] * df['Size'])).round(2)
 
     return df
 
 
+def prepare_import_rows(df: pd.DataFrame) -> list[tuple]:
+    """
+    Extract the fields the importer needs from a cleaned dataframe.
+
+    Works column-at-a-time instead of row-at-a-time: each column is
+    converted once, and the catch-weight / unit price math is done with
+    NumPy over whole arrays.
+
+    Returns a list of tuples:
+        (row_label, product_name, sku, brand, pack, size, unit_abbr,
+         case_price, unit_price, is_catch_weight)
+    """
+    n = len(df)
+
+    def text(column, strip=False):
+        if column not in df.columns:
+            return pd.Series([None] * n, index=df.index, dtype=object)
+        values = df[column]
+        as_text = values.astype(str)
+        if strip:
+            as_text = as_text.str.strip()
+        return as_text.astype(object).where(values.notna(), None)
+
+    def number(column):
+        if column not in df.columns:
+            return np.full(n, np.nan)
+        return pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float)
+
+    names = text('Desc', strip=True).fillna('')
+    skus = text('SUPC').fillna('')
+    brands = text('Brand', strip=True)
+    units = text('Unit')
+    pack = np.trunc(number('Pack'))
+    size = number('Size')
+    case_price = number('Case $')
+    unit_price = number('Unit $')
+    if 'is_catch_weight' in df.columns:
+        is_catch_weight = df['is_catch_weight'].fillna(False).astype(bool).to_numpy()
+    else:
+        is_catch_weight = np.zeros(n, dtype=bool)
+
+    # Truthiness of the original per-row checks: present and non-zero
+    has_case = ~np.isnan(case_price) & (case_price != 0)
+    has_pack_size = ~np.isnan(pack) & (pack != 0) & ~np.isnan(size) & (size != 0)
+
+    # For Shamrock catch weight items, the Price column is per-lb price
+    # So: Unit $ = Price, Case $ = Pack * Size (in lbs) * Price
+    cw = is_catch_weight & has_case
+    is_oz = units.fillna('').str.upper().eq('OZ').to_numpy()
+    size_in_lbs = np.where(is_oz, size / 16, size)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cw_case_price = pack * size_in_lbs * case_price
+        # For non-catch-weight: calculate unit price from case price
+        calc_unit_price = case_price / (pack * size)
+
+    calc_unit = ~cw & np.isnan(unit_price) & has_case & has_pack_size
+    calc_case = cw & has_pack_size
+    new_unit_price = np.where(cw, case_price, unit_price)
+    new_unit_price = np.where(calc_unit, calc_unit_price, new_unit_price)
+    new_case_price = np.where(calc_case, cw_case_price, case_price)
+
+    def to_list(values, cast=float, rounded=None):
+        result = [None if np.isnan(v) else cast(v) for v in values.tolist()]
+        if rounded is not None:
+            # Python round() per value keeps cents identical to the scalar math
+            for i in np.flatnonzero(rounded).tolist():
+                result[i] = round(result[i], 2)
+        return result
+
+    return list(zip(
+        df.index.tolist(),
+        names.tolist(),
+        skus.tolist(),
+        brands.tolist(),
+        to_list(pack, int),
+        to_list(size),
+        units.tolist(),
+        to_list(new_case_price, rounded=calc_case),
+        to_list(new_unit_price, rounded=calc_unit),
+        is_catch_weight.tolist(),
+    ))
+
+
+def read_upload_frames(source, filename_lower: str, config: dict):
+    """
+    Parse an uploaded vendor file into raw dataframes.
+
+    CSV files are read UPLOAD_CSV_CHUNK_ROWS rows at a time so large price
+    lists are cleaned and imported with bounded memory. Excel files, and
+    vendors whose real column names sit in the first data row, are parsed
+    whole; `source` is closed once they are, so the dataframe is the only
+    copy of the upload held during the import.
+    """
+    usecols = config["_read_usecols"]
+
+    if filename_lower.endswith('.csv') and not config.get("skip_first_data_row"):
+        yield from pd.read_csv(source, header=config["header_row"], usecols=usecols,
+                               chunksize=UPLOAD_CSV_CHUNK_ROWS)
+        return
+
+    if filename_lower.endswith('.csv'):
+        df = pd.read_csv(source, header=config["header_row"], usecols=usecols)
+    elif filename_lower.endswith('.xlsx'):
+        df = pd.read_excel(source, header=config["header_row"], usecols=usecols, engine='openpyxl')
+    else:
+        # .xls file (older Excel format)
+        df = pd.read_excel(source, header=config["header_row"], usecols=usecols, engine='xlrd')
+
+    source.close()
+    yield df
+
+
+# Units and distributors are reference data that rarely change; an upload
+# resolves them from these in-process maps instead of querying per row.
+_lookup_cache = TTLCache(maxsize=1, ttl=UNITS_CACHE_TTL_SECONDS)
+
+
+def _lookup_maps(cursor, force: bool = False) -> dict:
+    """Return the unit and distributor lookup maps, reloading them if stale."""
+    def load():
+        cursor.execute("SELECT id, LOWER(abbreviation) AS abbr, LOWER(name) AS name FROM units ORDER BY id")
+        units = cursor.fetchall()
+        unit_ids = {}
+        for row in units:
+            if row["abbr"]:
+                unit_ids.setdefault(row["abbr"], row["id"])
+
+        cursor.execute("SELECT id, code FROM distributors")
+        return {
+            "unit_ids": unit_ids,
+            "unit_names": [(row["name"], row["id"]) for row in units if row["name"]],
+            "distributor_ids": {row["code"]: row["id"] for row in cursor.fetchall()},
+        }
+
+    if force:
+        _lookup_cache.invalidate()
+    return _lookup_cache.get_or_set("lookups", load)
+
+
 def get_distributor_id(cursor, distributor_code: str) -> int:
     """Get distributor ID from code."""
-    cursor.execute("SELECT id FROM distributors WHERE code = %s", (distributor_code,))
-    result = cursor.fetchone()
-    if not result:
+    distributor_id = _lookup_maps(cursor)["distributor_ids"].get(distributor_code)
+    if distributor_id is None:
+        # May have been added since the last refresh
+        distributor_id = _lookup_maps(cursor, force=True)["distributor_ids"].get(distributor_code)
+    if distributor_id is None:
         raise ValueError(f"Distributor '{distributor_code}' not found in database")
-    # RealDictCursor returns dict, must use column name not index
-    return result["id"]
+    return distributor_id
 
 
 def get_unit_id(cursor, unit_abbr: str) -> Optional[int]:
-    """Get unit ID from abbreviation (case-insensitive)."""
+    """Get unit ID from abbreviation (case-insensitive), falling back to a name match."""
     if not unit_abbr or unit_abbr == 'nan':
         return None
 
-    cursor.execute("SELECT id FROM units WHERE LOWER(abbreviation) = LOWER(%s)", (unit_abbr,))
-    result = cursor.fetchone()
-    if result:
-        return result["id"]  # Use column name instead of index
+    lookups = _lookup_maps(cursor)
+    u = unit_abbr.lower()
+    hit = lookups["unit_ids"].get(u)
+    if hit:
+        return hit
 
-    cursor.execute("SELECT id FROM units WHERE LOWER(name) LIKE LOWER(%s)", (f"%{unit_abbr}%",))
-    result = cursor.fetchone()
-    return result["id"] if result else None  # Use column name instead of index
+    for name, uid in lookups["unit_names"]:
+        if u in name:
+            return uid
+    return None
 
 
-@router.get("/distributors")
-def get_distributors():
-    """Get list of available distributors for upload."""
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, name, code FROM distributors WHERE is_active = 1 ORDER BY name")
-        rows = cursor.fetchall()
-        return [{"id": row["id"], "name": row["name"], "code": row["code"]} for row in rows]
+def _import_row(cursor, row: tuple, ctx: dict, counts: dict):
+    """Write one prepared row; bumps counts["new_products"] / counts["updated_prices"]."""
+    (_, product_name, sku, brand, pack, size, unit_abbr,
+     case_price, unit_price, is_catch_weight) = row
+    distributor_id = ctx["distributor_id"]
+    organization_id = ctx["organization_id"]
+
+    unit_id = ctx["unit_ids"].get(unit_abbr) if unit_abbr else None
+
+    # Check if product exists in this organization (products are shared across outlets)
+    # Also check for existing distributor_product link by SKU to avoid unique constraint violation
+    cursor.execute("""
+        SELECT p.id as product_id, dp.id as distributor_product_id
+        FROM products p
+        LEFT JOIN distributor_products dp ON dp.product_id = p.id
+            AND dp.distributor_id = %s
+        WHERE p.name = %s AND (p.brand = %s OR (p.brand IS NULL AND %s IS NULL))
+              AND p.pack = %s AND p.size = %s AND p.organization_id = %s
+
+        UNION
+
+        SELECT p.id as product_id, dp.id as distributor_product_id
+        FROM distributor_products dp
+        JOIN products p ON p.id = dp.product_id
+        WHERE dp.organization_id = %s AND dp.distributor_id = %s AND dp.distributor_sku = %s
+
+        LIMIT 1
+    """, (distributor_id, product_name, brand, brand, pack, size, organization_id,
+          organization_id, distributor_id, sku))
+
+    existing = cursor.fetchone()
+
+    if existing and existing["product_id"]:
+        product_id = existing["product_id"]
+        distributor_product_id = existing["distributor_product_id"]
+
+        if not distributor_product_id:
+            # Create distributor_product link (org-wide, no outlet_id)
+            cursor.execute("""
+                INSERT INTO distributor_products (distributor_id, product_id, distributor_sku, distributor_name, organization_id)
+                VALUES (%s, %s, %s, %s, %s)
+                RETURNING id
+            """, (distributor_id, product_id, sku, product_name, organization_id))
+            distributor_product_id = cursor.fetchone()["id"]
+    else:
+        # Create new product (org-wide, no outlet_id)
+        cursor.execute("""
+            INSERT INTO products (name, brand, pack, size, unit_id, is_catch_weight, organization_id)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            RETURNING id
+        """, (product_name, brand, pack, size, unit_id, int(is_catch_weight), organization_id))
+        product_id = cursor.fetchone()["id"]
+        counts["new_products"] += 1
+
+        # Create distributor_product link (org-wide, no outlet_id)
+        cursor.execute("""
+            INSERT INTO distributor_products (distributor_id, product_id, distributor_sku, distributor_name, organization_id)
+            VALUES (%s, %s, %s, %s, %s)
+            RETURNING id
+        """, (distributor_id, product_id, sku, product_name, organization_id))
+        distributor_product_id = cursor.fetchone()["id"]
+
+    # Insert/update price (per outlet - allows different outlets to have different prices)
+    if case_price is not None:
+        _write_price(cursor, distributor_product_id, case_price, unit_price, ctx, counts)
+
+
+_PRICE_UPSERT_SQL = """
+    INSERT INTO price_history (distributor_product_id, outlet_id, case_price, unit_price, effective_date, import_batch_id)
+    VALUES {values}
+    ON CONFLICT (distributor_product_id, outlet_id, effective_date) DO UPDATE
+    SET case_price = EXCLUDED.case_price,
+        unit_price = EXCLUDED.unit_price,
+        import_batch_id = EXCLUDED.import_batch_id
+    RETURNING (xmax = 0) AS inserted
+"""
+
+
+def _write_price(cursor, distributor_product_id: int, case_price: float, unit_price: Optional[float],
+                 ctx: dict, counts: dict):
+    """Upsert today's outlet price for a distributor product."""
+    cursor.execute(_PRICE_UPSERT_SQL.format(values="(%s, %s, %s, %s, %s, %s)"), (
+        distributor_product_id, ctx["outlet_id"], case_price, unit_price, ctx["eff_date"], ctx["batch_id"]
+    ))
+    if not cursor.fetchone()["inserted"]:
+        counts["updated_prices"] += 1
+
+
+def _find_existing_products(cursor, rows: list[tuple], ctx: dict) -> dict:
+    """
+    Resolve which rows already have a product / distributor_product.
+
+    Stages the chunk's lookup keys in a temp table and runs the same match
+    _import_row does (name/brand/pack/size, else distributor SKU) for every
+    row in one query.
+
+    Returns {position in rows: (product_id, distributor_product_id or None)}
+    """
+    distributor_id = ctx["distributor_id"]
+    organization_id = ctx["organization_id"]
+
+    cursor.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS staging_upload (
+            pos INTEGER, name TEXT, brand TEXT, pack INTEGER, size DOUBLE PRECISION, sku TEXT
+        ) ON COMMIT DROP
+    """)
+    cursor.execute("TRUNCATE staging_upload")
+    execute_values(
+        cursor,
+        "INSERT INTO staging_upload (pos, name, brand, pack, size, sku) VALUES %s",
+        [(pos, row[1], row[3], row[4], row[5], row[2]) for pos, row in enumerate(rows)],
+        page_size=IMPORT_BATCH_SIZE,
+    )
+
+    cursor.execute("""
+        SELECT s.pos, e.product_id, e.distributor_product_id
+        FROM staging_upload s
+        CROSS JOIN LATERAL (
+            SELECT p.id as product_id, dp.id as distributor_product_id
+            FROM products p
+            LEFT JOIN distributor_products dp ON dp.product_id = p.id
+                AND dp.distributor_id = %s
+            WHERE p.name = s.name AND (p.brand = s.brand OR (p.brand IS NULL AND s.brand IS NULL))
+                  AND p.pack = s.pack AND p.size = s.size AND p.organization_id = %s
+
+            UNION
+
+            SELECT p.id as product_id, dp.id as distributor_product_id
+            FROM distributor_products dp
+            JOIN products p ON p.id = dp.product_id
+            WHERE dp.organization_id = %s AND dp.distributor_id = %s AND dp.distributor_sku = s.sku
+
+            LIMIT 1
+        ) e
+    """, (distributor_id, organization_id, organization_id, distributor_id))
+
+    return {r["pos"]: (r["product_id"], r["distributor_product_id"]) for r in cursor.fetchall()}
+
+
+def _import_chunk(cursor, rows: list[tuple], ctx: dict, counts: dict):
+    """
+    Set-based equivalent of calling _import_row for each row in order.
+
+    Existing products are resolved in one query, then new products,
+    distributor_products and prices are each written with one multi-row
+    INSERT (prices as an upsert).
+    Rows that repeat a product or SKU created earlier in the same chunk
+    reuse it, as they would have when rows were written one at a time.
+    """
+    distributor_id = ctx["distributor_id"]
+    organization_id = ctx["organization_id"]
+    unit_ids = ctx["unit_ids"]
+
+    existing = _find_existing_products(cursor, rows, ctx)
+
+    # Products/links to create. Until they are inserted they are referenced
+    # as ("product", i) / ("link", i); existing ones by their database id.
+    new_products = []
+    new_links = []
+    created_by_key = {}
+    created_by_sku = {}
+    link_for_product = {}
+    row_links = []
+
+    for pos, (_, product_name, sku, brand, pack, size, unit_abbr,
+              case_price, unit_price, is_catch_weight) in enumerate(rows):
+        key = (product_name, brand, pack, size)
+        product_ref, link_ref = existing.get(pos, (None, None))
+
+        if product_ref is None:
+            if key in created_by_key:
+                product_ref = created_by_key[key]
+            elif sku is not None and sku in created_by_sku:
+                product_ref, link_ref = created_by_sku[sku]
+
+        if product_ref is None:
+            product_ref = ("product", len(new_products))
+            new_products.append((product_name, brand, pack, size, unit_ids.get(unit_abbr) if unit_abbr else None,
+                                 int(is_catch_weight), organization_id))
+            counts["new_products"] += 1
+            # NULL pack/size never compare equal in the lookup query either
+            if pack is not None and size is not None:
+                created_by_key[key] = product_ref
+
+        if link_ref is None:
+            link_ref = link_for_product.get(product_ref)
+        if link_ref is None:
+            link_ref = ("link", len(new_links))
+            new_links.append((product_ref, sku, product_name))
+            link_for_product[product_ref] = link_ref
+            if sku is not None:
+                created_by_sku[sku] = (product_ref, link_ref)
+
+        row_links.append(link_ref)
+
+    product_ids = _insert_returning_ids(cursor, """
+        INSERT INTO products (name, brand, pack, size, unit_id, is_catch_weight, organization_id)
+        VALUES %s RETURNING id
+    """, new_products)
+
+    def resolve(ref, ids):
+        return ids[ref[1]] if isinstance(ref, tuple) else ref
+
+    link_ids = _insert_returning_ids(cursor, """
+        INSERT INTO distributor_products (distributor_id, product_id, distributor_sku, distributor_name, organization_id)
+        VALUES %s RETURNING id
+    """, [(distributor_id, resolve(product_ref, product_ids), sku, product_name, organization_id)
+          for product_ref, sku, product_name in new_links])
+
+    # One price per distributor product: a later row for the same product
+    # overwrites an earlier one, which counts as an update just as it did
+    # when rows were written one at a time.
+    prices = {}
+    for row, link_ref in zip(rows, row_links):
+        case_price, unit_price = row[7], row[8]
+        if case_price is None:
+            continue
+        distributor_product_id = resolve(link_ref, link_ids)
+        if distributor_product_id in prices:
+            counts["updated_prices"] += 1
+        prices[distributor_product_id] = (case_price, unit_price)
+
+    if prices:
+        results = execute_values(
+            cursor,
+            _PRICE_UPSERT_SQL.format(values="%s"),
+            [(dp_id, ctx["outlet_id"], case_price, unit_price, ctx["eff_date"], ctx["batch_id"])
+             for dp_id, (case_price, unit_price) in prices.items()],
+            page_size=IMPORT_BATCH_SIZE,
+            fetch=True,
+        )
+        counts["updated_prices"] += sum(1 for r in results if not r["inserted"])
+
+
+def _insert_returning_ids(cursor, query: str, values: list[tuple]) -> list[int]:
+    """Multi-row INSERT ... VALUES %s RETURNING id; ids come back in input order."""
+    if not values:
+        return []
+    rows = execute_values(cursor, query, values, page_size=IMPORT_BATCH_SIZE, fetch=True)
+    return [row["id"] for row in rows]
+
+
+def import_rows_to_db(cursor, import_rows: list[tuple], ctx: dict, stats: dict):
+    """
+    Import prepared rows (see prepare_import_rows) into products,
+    distributor_products and price_history.
+
+    Rows are validated up front and then written set-based under a single
+    savepoint (see _import_chunk). Only if that fails is the chunk rolled
+    back and replayed row-by-row with a savepoint per row, so good rows
+    still import and the failing ones are reported.
+
+    Args:
+        cursor: Cursor inside the upload's transaction
+        import_rows: Rows from prepare_import_rows
+        ctx: distributor_id, organization_id, outlet_id, eff_date, batch_id
+            and a unit_ids cache shared across chunks
+        stats: Running counters (rows_imported, rows_failed, new_products,
+            updated_prices) and the errors list, updated in place
+    """
+    # Pre-validation: skip rows without product name
+    rows = [row for row in import_rows if row[1]]
+
+    # Resolve each distinct unit once instead of once per row
+    unit_ids = ctx["unit_ids"]
+    for unit_abbr in {row[6] for row in rows}:
+        if unit_abbr and unit_abbr not in unit_ids:
+            unit_ids[unit_abbr] = get_unit_id(cursor, unit_abbr)
+
+    # Fast path: no per-row savepoints
+    counts = {"new_products": 0, "updated_prices": 0}
+    cursor.execute("SAVEPOINT import_chunk")
+    try:
+        _import_chunk(cursor, rows, ctx, counts)
+    except Exception:
+        cursor.execute("ROLLBACK TO SAVEPOINT import_chunk")
+        cursor.execute("RELEASE SAVEPOINT import_chunk")
+        logger.info("csv_upload: Chunk failed as a whole, replaying row-by-row")
+        _import_rows_isolated(cursor, rows, ctx, stats)
+        return
+    cursor.execute("RELEASE SAVEPOINT import_chunk")
+
+    stats["rows_imported"] += len(rows)
+    stats["new_products"] += counts["new_products"]
+    stats["updated_prices"] += counts["updated_prices"]
+
+
+def _import_rows_isolated(cursor, rows: list[tuple], ctx: dict, stats: dict):
+    """Reconciliation path: import rows one at a time, isolating each in a savepoint."""
+    for row in rows:
+        idx = row[0]
+        # Create savepoint for this row to isolate errors
+        savepoint_name = f"row_{idx}"
+        cursor.execute(f"SAVEPOINT {savepoint_name}")
+
+        try:
+            _import_row(cursor, row, ctx, stats)
+            stats["rows_imported"] += 1
+            # Release savepoint on success
+            cursor.execute(f"RELEASE SAVEPOINT {savepoint_name}")
+
+        except Exception as e:
+            # Rollback to savepoint to clear the error and continue processing
+            cursor.execute(f"ROLLBACK TO SAVEPOINT {savepoint_name}")
+            cursor.execute(f"RELEASE SAVEPOINT {savepoint_name}")
+            stats["rows_failed"] += 1
+            if len(stats["errors"]) < 10:  # Limit error messages
+                stats["errors"].append(f"Row {idx + 1}: {str(e)}")
 
 
 @router.post("/csv", response_model=UploadResult)
@@ -424,204 +921,124 @@ async def upload_csv(
 
     logger.info(f"csv_upload: Using outlet_id: {outlet_id}, organization_id: {organization_id}")
 
-    # Read file content
-    try:
-        content = await file.read()
-        config = VENDOR_CONFIGS[distributor_code]
-
-        if filename_lower.endswith('.csv'):
-            df = pd.read_csv(io.BytesIO(content), header=config["header_row"])
-        elif filename_lower.endswith('.xlsx'):
-            df = pd.read_excel(io.BytesIO(content), header=config["header_row"], engine='openpyxl')
-        else:
-            # .xls file (older Excel format)
-            df = pd.read_excel(io.BytesIO(content), header=config["header_row"], engine='xlrd')
-
-        logger.info(f"csv_upload: File read successfully, {len(df)} rows")
-
-        # Apply cleaning
-        df = clean_dataframe(df, distributor_code)
-        logger.info(f"csv_upload: Data cleaned successfully")
-
-    except Exception as e:
-        import traceback
-        logger.error(f" File processing failed: {str(e)}")
-        traceback.print_exc()
-        raise HTTPException(status_code=400, detail=f"Error processing file: {str(e)}")
-
     # Import to database
-    errors = []
-    rows_imported = 0
-    rows_failed = 0
-    new_products = 0
-    updated_prices = 0
+    stats = {
+        "rows_imported": 0,
+        "rows_failed": 0,
+        "new_products": 0,
+        "updated_prices": 0,
+        "errors": [],
+    }
     batch_id = str(uuid.uuid4())
 
-    logger.info(f"csv_upload: Starting database import, batch_id: {batch_id}")
+    # Spool the upload to a temp file (in memory up to a limit, on disk
+    # beyond) so the body is never held as one large bytes object; the
+    # parser then reads it chunk by chunk.
+    spool = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MAX_MEMORY)
 
-    try:
-        with get_db() as conn:
-            cursor = conn.cursor()
-            logger.info(f"csv_upload: Database connection established")
+    logger.info(f"csv_upload: Starting database import, batch_id: {batch_id}")
 
-            # Get distributor ID
-            distributor_id = get_distributor_id(cursor, distributor_code)
-            logger.info(f"csv_upload: Distributor ID: {distributor_id}")
-
-            # Create import batch with organization_id and outlet_id
-            cursor.execute("""
-                INSERT INTO import_batches (id, distributor_id, filename, import_date, organization_id, outlet_id)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """, (batch_id, distributor_id, file.filename, datetime.now(), organization_id, outlet_id))
-            logger.info(f"csv_upload: Import batch created")
-
-            # Process each row
-            for idx, row in df.iterrows():
-                # Create savepoint for this row to isolate errors
-                savepoint_name = f"row_{idx}"
-                cursor.execute(f"SAVEPOINT {savepoint_name}")
-
-                try:
-                    # Extract data
-                    product_name = str(row.get('Desc', '')).strip() if pd.notna(row.get('Desc')) else ''
-                    if not product_name:
-                        cursor.execute(f"RELEASE SAVEPOINT {savepoint_name}")
-                        continue  # Skip rows without product name
-
-                    sku = str(row.get('SUPC', '')) if pd.notna(row.get('SUPC')) else ''
-                    brand = str(row.get('Brand', '')).strip() if pd.notna(row.get('Brand')) else None
-                    pack = int(row.get('Pack', 0)) if pd.notna(row.get('Pack')) else None
-                    size = float(row.get('Size', 0)) if pd.notna(row.get('Size')) else None
-                    unit_abbr = str(row.get('Unit', '')) if pd.notna(row.get('Unit')) else None
-                    case_price = float(row.get('Case $', 0)) if pd.notna(row.get('Case $')) else None
-                    unit_price = float(row.get('Unit $', 0)) if pd.notna(row.get('Unit $')) else None
-                    is_catch_weight = bool(row.get('is_catch_weight', False)) if 'is_catch_weight' in row else False
-
-                    # For Shamrock catch weight items, the Price column is per-lb price
-                    # So: Unit $ = Price, Case $ = Pack * Size (in lbs) * Price
-                    if is_catch_weight and case_price:
-                        unit_price = case_price  # Price column is per-lb
-                        if pack and size:
-                            # Convert size to lbs if unit is OZ
-                            size_in_lbs = size / 16 if unit_abbr and unit_abbr.upper() == 'OZ' else size
-                            case_price = round(pack * size_in_lbs * unit_price, 2)  # Calculate approx case cost
-                    elif unit_price is None and case_price and pack and size:
-                        # For non-catch-weight: calculate unit price from case price
-                        unit_price = round(case_price / (pack * size), 2)
-
-                    unit_id = get_unit_id(cursor, unit_abbr) if unit_abbr else None
-
-                    # Check if product exists in this organization (products are shared across outlets)
-                    # Also check for existing distributor_product link by SKU to avoid unique constraint violation
-                    cursor.execute("""
-                        SELECT p.id as product_id, dp.id as distributor_product_id
-                        FROM products p
-                        LEFT JOIN distributor_products dp ON dp.product_id = p.id
-                            AND dp.distributor_id = %s
-                        WHERE p.name = %s AND (p.brand = %s OR (p.brand IS NULL AND %s IS NULL))
-                              AND p.pack = %s AND p.size = %s AND p.organization_id = %s
-
-                        UNION
-
-                        SELECT p.id as product_id, dp.id as distributor_product_id
-                        FROM distributor_products dp
-                        JOIN products p ON p.id = dp.product_id
-                        WHERE dp.organization_id = %s AND dp.distributor_id = %s AND dp.distributor_sku = %s
-
-                        LIMIT 1
-                    """, (distributor_id, product_name, brand, brand, pack, size, organization_id,
-                          organization_id, distributor_id, sku))
-
-                    existing = cursor.fetchone()
-
-                    if existing and existing["product_id"]:
-                        product_id = existing["product_id"]
-                        distributor_product_id = existing["distributor_product_id"]
-
-                        if not distributor_product_id:
-                            # Create distributor_product link (org-wide, no outlet_id)
-                            cursor.execute("""
-                                INSERT INTO distributor_products (distributor_id, product_id, distributor_sku, distributor_name, organization_id)
-                                VALUES (%s, %s, %s, %s, %s)
-                                RETURNING id
-                            """, (distributor_id, product_id, sku, product_name, organization_id))
-                            distributor_product_id = cursor.fetchone()["id"]
-                    else:
-                        # Create new product (org-wide, no outlet_id)
-                        cursor.execute("""
-                            INSERT INTO products (name, brand, pack, size, unit_id, is_catch_weight, organization_id)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s)
-                            RETURNING id
-                        """, (product_name, brand, pack, size, unit_id, int(is_catch_weight), organization_id))
-                        product_id = cursor.fetchone()["id"]
-                        new_products += 1
-
-                        # Create distributor_product link (org-wide, no outlet_id)
-                        cursor.execute("""
-                            INSERT INTO distributor_products (distributor_id, product_id, distributor_sku, distributor_name, organization_id)
-                            VALUES (%s, %s, %s, %s, %s)
-                            RETURNING id
-                        """, (distributor_id, product_id, sku, product_name, organization_id))
-                        distributor_product_id = cursor.fetchone()["id"]
-
-                    # Insert/update price (per outlet - allows different outlets to have different prices)
-                    if case_price is not None:
-                        cursor.execute("""
-                            SELECT id FROM price_history
-                            WHERE distributor_product_id = %s AND outlet_id = %s AND effective_date = %s
-                        """, (distributor_product_id, outlet_id, eff_date))
-
-                        if cursor.fetchone():
-                            cursor.execute("""
-                                UPDATE price_history
-                                SET case_price = %s, unit_price = %s, import_batch_id = %s
-                                WHERE distributor_product_id = %s AND outlet_id = %s AND effective_date = %s
-                            """, (case_price, unit_price, batch_id, distributor_product_id, outlet_id, eff_date))
-                            updated_prices += 1
-                        else:
-                            cursor.execute("""
-                                INSERT INTO price_history (distributor_product_id, outlet_id, case_price, unit_price, effective_date, import_batch_id)
-                                VALUES (%s, %s, %s, %s, %s, %s)
-                            """, (distributor_product_id, outlet_id, case_price, unit_price, eff_date, batch_id))
-
-                    rows_imported += 1
-                    # Release savepoint on success
-                    cursor.execute(f"RELEASE SAVEPOINT {savepoint_name}")
-
-                except Exception as e:
-                    # Rollback to savepoint to clear the error and continue processing
-                    cursor.execute(f"ROLLBACK TO SAVEPOINT {savepoint_name}")
-                    cursor.execute(f"RELEASE SAVEPOINT {savepoint_name}")
-                    rows_failed += 1
-                    if len(errors) < 10:  # Limit error messages
-                        errors.append(f"Row {idx + 1}: {str(e)}")
-
-            # Update batch statistics
-            cursor.execute("""
-                UPDATE import_batches
-                SET rows_imported = %s, rows_failed = %s
-                WHERE id = %s
-            """, (rows_imported, rows_failed, batch_id))
-
-            conn.commit()
-
-            return UploadResult(
-                success=True,
-                message=f"Successfully imported {rows_imported} products from {file.filename}",
-                batch_id=batch_id,
-                rows_imported=rows_imported,
-                rows_failed=rows_failed,
-                new_products=new_products,
-                updated_prices=updated_prices,
-                errors=errors
-            )
+    ctx = {
+        "organization_id": organization_id,
+        "outlet_id": outlet_id,
+        "eff_date": eff_date,
+        "batch_id": batch_id,
+        "unit_ids": {},
+    }
 
+    try:
+        # Copy the upload into the spool chunk by chunk, stopping at the size
+        # cap. The multipart parser has already received the whole body by
+        # now, so this only spares the second copy and the parse/import;
+        # bodies with a Content-Length over the cap are refused earlier by
+        # the limit_upload_size middleware.
+        total = 0
+        while chunk := await file.read(UPLOAD_READ_CHUNK_BYTES):
+            total += len(chunk)
+            if total > MAX_UPLOAD_BYTES:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Upload too large. Maximum size is {MAX_UPLOAD_BYTES // (1024 * 1024)} MB"
+                )
+            spool.write(chunk)
+        spool.seek(0)
+
+        # Parsing, cleaning and the (sync) database import are all blocking;
+        # run them in a worker thread so the event loop keeps serving requests.
+        return await asyncio.to_thread(
+            _process_upload, file.filename, spool, filename_lower, distributor_code, ctx, stats
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         # Log the full error for debugging
         import traceback
         logger.error(f" Upload failed: {str(e)}")
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Import failed: {str(e)}")
+    finally:
+        spool.close()
+
+
+def _process_upload(filename: str, spool, filename_lower: str, distributor_code: str,
+                    ctx: dict, stats: dict) -> UploadResult:
+    """Parse, clean and import a spooled upload. Blocking; called off the event loop."""
+    config = VENDOR_CONFIGS[distributor_code]
+    batch_id = ctx["batch_id"]
+
+    with get_db() as conn:
+        cursor = conn.cursor()
+        logger.info(f"csv_upload: Database connection established")
+
+        # Get distributor ID
+        distributor_id = get_distributor_id(cursor, distributor_code)
+        ctx["distributor_id"] = distributor_id
+        logger.info(f"csv_upload: Distributor ID: {distributor_id}")
+
+        # Create import batch with organization_id and outlet_id
+        cursor.execute("""
+            INSERT INTO import_batches (id, distributor_id, filename, import_date, organization_id, outlet_id)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, (batch_id, distributor_id, filename, datetime.now(), ctx["organization_id"], ctx["outlet_id"]))
+        logger.info(f"csv_upload: Import batch created")
+
+        frames = read_upload_frames(spool, filename_lower, config)
+        while True:
+            # Parse + clean the next chunk of the file
+            try:
+                df = next(frames, None)
+                if df is None:
+                    break
+                logger.info(f"csv_upload: Chunk read successfully, {len(df)} rows")
+                df = clean_dataframe(df, distributor_code)
+            except Exception as e:
+                import traceback
+                logger.error(f" File processing failed: {str(e)}")
+                traceback.print_exc()
+                raise HTTPException(status_code=400, detail=f"Error processing file: {str(e)}")
+
+            # Extract all row values column-at-a-time and import them
+            import_rows_to_db(cursor, prepare_import_rows(df), ctx, stats)
+
+        # Update batch statistics
+        cursor.execute("""
+            UPDATE import_batches
+            SET rows_imported = %s, rows_failed = %s
+            WHERE id = %s
+        """, (stats["rows_imported"], stats["rows_failed"], batch_id))
+
+        conn.commit()
+
+        return UploadResult(
+            success=True,
+            message=f"Successfully imported {stats['rows_imported']} products from {filename}",
+            batch_id=batch_id,
+            rows_imported=stats["rows_imported"],
+            rows_failed=stats["rows_failed"],
+            new_products=stats["new_products"],
+            updated_prices=stats["updated_prices"],
+            errors=stats["errors"]
+        )
 
 
 @router.get("/history")
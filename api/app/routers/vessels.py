@@ -5,14 +5,49 @@ Vessels are organization-wide containers (e.g., Chafing Dish, Small Bowl)
 that can have default capacities and product-specific capacities.
 """
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request, Body
 from pydantic import BaseModel
 from typing import Optional, List
-from ..database import get_db, dicts_from_rows, dict_from_row
+from functools import lru_cache
+from psycopg2.extras import execute_values
+import psycopg2
+from ..database import get_db, execute_prepared
 from ..auth import get_current_user
+from ..config import READ_CACHE_TTL_SECONDS, READ_CACHE_MAX_ENTRIES, UNITS_CACHE_TTL_SECONDS
+from ..utils.cache import TTLCache
+from ..utils.ndjson import wants_ndjson, ndjson_response
+from ..utils.responses import ORJSONResponse
 
 router = APIRouter(prefix="/vessels", tags=["vessels"])
 
+# GET results keyed by (organization_id, endpoint, args...); any write to an
+# org's vessels drops that org's entries
+_read_cache = TTLCache(maxsize=READ_CACHE_MAX_ENTRIES, ttl=READ_CACHE_TTL_SECONDS)
+
+
+def _invalidate_org(org_id: int):
+    """Forget cached vessel reads for an organization after a write."""
+    _read_cache.invalidate(lambda key: key[0] == org_id)
+
+
+# Unit abbreviation/name by id, filled in after the query instead of joining
+# units into every vessel read
+_units_cache = TTLCache(maxsize=1, ttl=UNITS_CACHE_TTL_SECONDS)
+
+
+def _unit_labels(cursor) -> dict:
+    """Return {unit_id: (abbreviation, name)} for every unit."""
+    def load():
+        execute_prepared(cursor, "vessels_unit_labels", "SELECT id, abbreviation, name FROM units")
+        return {row["id"]: (row["abbreviation"], row["name"]) for row in cursor.fetchall()}
+    return _units_cache.get_or_set("units", load)
+
+
+def _add_unit_labels(row: dict, units: dict, unit_key: str, prefix: str) -> dict:
+    """Set row[prefix + 'abbr'] / row[prefix + 'name'] from row[unit_key]."""
+    row[prefix + "abbr"], row[prefix + "name"] = units.get(row[unit_key], (None, None))
+    return row
+
 
 # ============================================
 # Pydantic Models
@@ -47,6 +82,60 @@ class VesselCapacityUpdate(BaseModel):
     notes: Optional[str] = None
 
 
+# ============================================
+# Update Statements
+# ============================================
+
+# Columns a PATCH may set; anything else is ignored
+_VESSEL_UPDATABLE = frozenset({"name", "default_capacity", "default_unit_id"})
+_CAPACITY_UPDATABLE = frozenset({"capacity", "unit_id", "notes"})
+
+
+@lru_cache(maxsize=64)
+def _vessel_update_sql(fields: tuple) -> str:
+    """UPDATE for a sorted tuple of vessel columns, built once per field set."""
+    return f"""
+        UPDATE vessels
+        SET {', '.join(f"{field} = %s" for field in fields)}, updated_at = NOW()
+        WHERE id = %s AND organization_id = %s
+        RETURNING id
+    """
+
+
+@lru_cache(maxsize=64)
+def _capacity_update_sql(fields: tuple) -> str:
+    """UPDATE for a sorted tuple of capacity columns, built once per field set."""
+    return f"""
+        UPDATE vessel_product_capacities vpc
+        SET {', '.join(f"{field} = %s" for field in fields)}, updated_at = NOW()
+        FROM vessels v
+        WHERE vpc.id = %s
+          AND vpc.vessel_id = %s
+          AND vpc.vessel_id = v.id
+          AND v.organization_id = %s
+        RETURNING vpc.id
+    """
+
+
+# ============================================
+# Prepared Reads
+# ============================================
+
+# list_vessels, prepared once per connection for each include_inactive value.
+# total_count is the number of vessels, repeated on every row.
+_LIST_VESSELS_SQL = """
+    SELECT
+        v.*,
+        COUNT(vpc.id) as capacity_count,
+        COUNT(*) OVER () as total_count
+    FROM vessels v
+    LEFT JOIN vessel_product_capacities vpc ON vpc.vessel_id = v.id
+    WHERE v.organization_id = $1 {where}
+    GROUP BY v.id
+    ORDER BY v.name
+"""
+
+
 # ============================================
 # Vessel Endpoints
 # ============================================
@@ -54,36 +143,54 @@ class VesselCapacityUpdate(BaseModel):
 @router.get("")
 def list_vessels(
     include_inactive: bool = False,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    request: Request = None
 ):
     """
     List all vessels for the organization.
     Includes default capacity info and count of product-specific capacities.
-    """
-    with get_db() as conn:
-        cursor = conn.cursor()
-        org_id = current_user["organization_id"]
 
-        where_clause = "v.organization_id = %s"
-        params = [org_id]
+    Send `Accept: application/x-ndjson` to stream the vessels one per line
+    instead of building the whole list; the first line is {"total": N}.
+    """
+    org_id = current_user["organization_id"]
+    units = {}
 
-        if not include_inactive:
-            where_clause += " AND v.is_active = 1"
+    def execute(cursor):
+        units.update(_unit_labels(cursor))
+        if include_inactive:
+            execute_prepared(cursor, "vessels_list_all", _LIST_VESSELS_SQL.format(where=""), (org_id,))
+        else:
+            execute_prepared(cursor, "vessels_list_active",
+                             _LIST_VESSELS_SQL.format(where="AND v.is_active = 1"), (org_id,))
+
+    def label(vessel):
+        del vessel["total_count"]
+        return _add_unit_labels(vessel, units, "default_unit_id", "default_unit_")
+
+    if wants_ndjson(request):
+        return ndjson_response(
+            execute,
+            transform=label,
+            header=lambda first: {"total": first["total_count"] if first else 0}
+        )
+
+    # Returned as ORJSONResponse so the list skips jsonable_encoder
+    cache_key = (org_id, "list", include_inactive)
+    cached = _read_cache.get(cache_key)
+    if cached is not None:
+        return ORJSONResponse(cached)
 
-        cursor.execute(f"""
-            SELECT
-                v.*,
-                u.abbreviation as default_unit_abbr,
-                u.name as default_unit_name,
-                (SELECT COUNT(*) FROM vessel_product_capacities WHERE vessel_id = v.id) as capacity_count
-            FROM vessels v
-            LEFT JOIN units u ON u.id = v.default_unit_id
-            WHERE {where_clause}
-            ORDER BY v.name
-        """, params)
+    with get_db() as conn:
+        cursor = conn.cursor()
+        execute(cursor)
+        rows = cursor.fetchall()
+        total = rows[0]["total_count"] if rows else 0
+        vessels = [label(vessel) for vessel in rows]
 
-        vessels = dicts_from_rows(cursor.fetchall())
-        return {"vessels": vessels, "total": len(vessels)}
+    result = {"vessels": vessels, "total": total}
+    _read_cache.set(cache_key, result)
+    return ORJSONResponse(result)
 
 
 @router.get("/{vessel_id}")
@@ -91,41 +198,47 @@ def get_vessel(vessel_id: int, current_user: dict = Depends(get_current_user)):
     """
     Get a single vessel with all its product-specific capacities.
     """
+    org_id = current_user["organization_id"]
+    cache_key = (org_id, "vessel", vessel_id)
+    cached = _read_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     with get_db() as conn:
         cursor = conn.cursor()
-        org_id = current_user["organization_id"]
 
-        cursor.execute("""
+        # Vessel and its product-specific capacities in one round trip
+        execute_prepared(cursor, "vessels_get", """
             SELECT
                 v.*,
-                u.abbreviation as default_unit_abbr,
-                u.name as default_unit_name
+                COALESCE((
+                    SELECT json_agg(c ORDER BY c.product_name)
+                    FROM (
+                        SELECT
+                            vpc.*,
+                            cp.common_name as product_name,
+                            cp.category as product_category
+                        FROM vessel_product_capacities vpc
+                        JOIN common_products cp ON cp.id = vpc.common_product_id
+                        WHERE vpc.vessel_id = v.id
+                    ) c
+                ), '[]'::json) as capacities
             FROM vessels v
-            LEFT JOIN units u ON u.id = v.default_unit_id
-            WHERE v.id = %s AND v.organization_id = %s
+            WHERE v.id = $1 AND v.organization_id = $2
         """, (vessel_id, org_id))
 
-        vessel = dict_from_row(cursor.fetchone())
+        vessel = cursor.fetchone()
         if not vessel:
             raise HTTPException(status_code=404, detail="Vessel not found")
 
-        # Get product-specific capacities
-        cursor.execute("""
-            SELECT
-                vpc.*,
-                cp.common_name as product_name,
-                cp.category as product_category,
-                u.abbreviation as unit_abbr,
-                u.name as unit_name
-            FROM vessel_product_capacities vpc
-            JOIN common_products cp ON cp.id = vpc.common_product_id
-            LEFT JOIN units u ON u.id = vpc.unit_id
-            WHERE vpc.vessel_id = %s
-            ORDER BY cp.common_name
-        """, (vessel_id,))
-
-        vessel["capacities"] = dicts_from_rows(cursor.fetchall())
-        return vessel
+        units = _unit_labels(cursor)
+
+    _add_unit_labels(vessel, units, "default_unit_id", "default_unit_")
+    for capacity in vessel["capacities"]:
+        _add_unit_labels(capacity, units, "unit_id", "unit_")
+
+    _read_cache.set(cache_key, vessel)
+    return vessel
 
 
 @router.post("")
@@ -144,11 +257,12 @@ def create_vessel(vessel: VesselCreate, current_user: dict = Depends(get_current
 
             vessel_id = cursor.fetchone()["id"]
             conn.commit()
+            _invalidate_org(org_id)
 
             return {"message": "Vessel created successfully", "vessel_id": vessel_id}
 
-        except Exception as e:
-            if "unique_vessel_per_org" in str(e):
+        except psycopg2.IntegrityError as e:
+            if e.diag.constraint_name == "unique_vessel_per_org":
                 raise HTTPException(
                     status_code=400,
                     detail=f"A vessel named '{vessel.name}' already exists"
@@ -167,42 +281,27 @@ def update_vessel(
         cursor = conn.cursor()
         org_id = current_user["organization_id"]
 
-        # Check vessel exists and belongs to org
-        cursor.execute("""
-            SELECT id FROM vessels
-            WHERE id = %s AND organization_id = %s
-        """, (vessel_id, org_id))
-
-        if not cursor.fetchone():
-            raise HTTPException(status_code=404, detail="Vessel not found")
-
-        # Build update query
-        update_fields = []
-        params = []
+        update_dict = updates.model_dump(exclude_unset=True)
+        fields = tuple(sorted(_VESSEL_UPDATABLE.intersection(update_dict)))
 
-        update_dict = updates.dict(exclude_unset=True)
-        for field, value in update_dict.items():
-            update_fields.append(f"{field} = %s")
-            params.append(value)
-
-        if not update_fields:
+        if not fields:
             raise HTTPException(status_code=400, detail="No fields to update")
 
-        update_fields.append("updated_at = NOW()")
-        params.append(vessel_id)
+        params = [update_dict[field] for field in fields] + [vessel_id, org_id]
 
         try:
-            cursor.execute(f"""
-                UPDATE vessels
-                SET {', '.join(update_fields)}
-                WHERE id = %s
-            """, params)
+            # Org check is part of the UPDATE; no row back means not found
+            cursor.execute(_vessel_update_sql(fields), params)
+
+            if not cursor.fetchone():
+                raise HTTPException(status_code=404, detail="Vessel not found")
 
             conn.commit()
+            _invalidate_org(org_id)
             return {"message": "Vessel updated successfully", "vessel_id": vessel_id}
 
-        except Exception as e:
-            if "unique_vessel_per_org" in str(e):
+        except psycopg2.IntegrityError as e:
+            if e.diag.constraint_name == "unique_vessel_per_org":
                 raise HTTPException(
                     status_code=400,
                     detail="A vessel with this name already exists"
@@ -230,6 +329,7 @@ def delete_vessel(vessel_id: int, current_user: dict = Depends(get_current_user)
             raise HTTPException(status_code=404, detail="Vessel not found")
 
         conn.commit()
+        _invalidate_org(org_id)
         return {"message": "Vessel deleted successfully", "vessel_id": vessel_id}
 
 
@@ -248,41 +348,106 @@ def create_vessel_capacity(
         cursor = conn.cursor()
         org_id = current_user["organization_id"]
 
-        # Verify vessel belongs to org
-        cursor.execute("""
-            SELECT id FROM vessels
-            WHERE id = %s AND organization_id = %s
-        """, (vessel_id, org_id))
-
-        if not cursor.fetchone():
-            raise HTTPException(status_code=404, detail="Vessel not found")
-
         try:
+            # Only inserts if the vessel belongs to the org
             cursor.execute("""
                 INSERT INTO vessel_product_capacities
                     (vessel_id, common_product_id, capacity, unit_id, notes)
-                VALUES (%s, %s, %s, %s, %s)
+                SELECT %s, %s, %s, %s, %s
+                WHERE EXISTS (
+                    SELECT 1 FROM vessels WHERE id = %s AND organization_id = %s
+                )
                 RETURNING id
             """, (
                 vessel_id,
                 capacity.common_product_id,
                 capacity.capacity,
                 capacity.unit_id,
-                capacity.notes
+                capacity.notes,
+                vessel_id,
+                org_id
             ))
 
-            capacity_id = cursor.fetchone()["id"]
+            row = cursor.fetchone()
+            if not row:
+                raise HTTPException(status_code=404, detail="Vessel not found")
+
+            capacity_id = row["id"]
             conn.commit()
+            _invalidate_org(org_id)
 
             return {"message": "Capacity added successfully", "capacity_id": capacity_id}
 
-        except Exception as e:
-            if "unique_vessel_product_capacity" in str(e):
+        except psycopg2.IntegrityError as e:
+            if e.diag.constraint_name == "unique_vessel_product_capacity":
                 raise HTTPException(
                     status_code=400,
                     detail="A capacity for this product already exists on this vessel"
                 )
-            if "fk_vessel_capacities_common_product" in str(e):
+            if e.diag.constraint_name == "fk_vessel_capacities_common_product":
+                raise HTTPException(
+                    status_code=400,
+                    detail="Common product not found"
+                )
+            raise
+
+
+@router.post("/{vessel_id}/capacities/bulk")
+def create_vessel_capacities_bulk(
+    vessel_id: int,
+    capacities: List[VesselCapacityCreate] = Body(..., max_length=500),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Add several product-specific capacities to a vessel at once (up to 500).
+    All rows are inserted in one statement and one commit; if any row
+    fails, none are added.
+    """
+    if not capacities:
+        raise HTTPException(status_code=400, detail="No capacities to add")
+
+    with get_db() as conn:
+        cursor = conn.cursor()
+        org_id = current_user["organization_id"]
+
+        try:
+            # Only inserts if the vessel belongs to the org; %%s is left for
+            # execute_values to fill with the rows
+            query = cursor.mogrify("""
+                INSERT INTO vessel_product_capacities
+                    (vessel_id, common_product_id, capacity, unit_id, notes)
+                SELECT %s, v.common_product_id, v.capacity, v.unit_id, v.notes
+                FROM (VALUES %%s) AS v (common_product_id, capacity, unit_id, notes)
+                WHERE EXISTS (
+                    SELECT 1 FROM vessels WHERE id = %s AND organization_id = %s
+                )
+                RETURNING id
+            """, (vessel_id, vessel_id, org_id))
+            rows = execute_values(
+                cursor, query,
+                [(c.common_product_id, c.capacity, c.unit_id, c.notes) for c in capacities],
+                template="(%s::integer, %s::numeric, %s::integer, %s::text)",
+                page_size=len(capacities),
+                fetch=True
+            )
+            if not rows:
+                raise HTTPException(status_code=404, detail="Vessel not found")
+
+            conn.commit()
+            _invalidate_org(org_id)
+
+            return {
+                "message": f"{len(rows)} capacities added successfully",
+                "capacity_ids": [row["id"] for row in rows]
+            }
+
+        except psycopg2.IntegrityError as e:
+            if e.diag.constraint_name == "unique_vessel_product_capacity":
+                raise HTTPException(
+                    status_code=400,
+                    detail="A capacity for one of these products already exists on this vessel"
+                )
+            if e.diag.constraint_name == "fk_vessel_capacities_common_product":
                 raise HTTPException(
                     status_code=400,
                     detail="Common product not found"
@@ -302,38 +467,22 @@ def update_vessel_capacity(
         cursor = conn.cursor()
         org_id = current_user["organization_id"]
 
-        # Verify capacity belongs to a vessel in this org
-        cursor.execute("""
-            SELECT vpc.id FROM vessel_product_capacities vpc
-            JOIN vessels v ON v.id = vpc.vessel_id
-            WHERE vpc.id = %s AND vpc.vessel_id = %s AND v.organization_id = %s
-        """, (capacity_id, vessel_id, org_id))
+        update_dict = updates.model_dump(exclude_unset=True)
+        fields = tuple(sorted(_CAPACITY_UPDATABLE.intersection(update_dict)))
 
-        if not cursor.fetchone():
-            raise HTTPException(status_code=404, detail="Capacity not found")
-
-        # Build update query
-        update_fields = []
-        params = []
-
-        update_dict = updates.dict(exclude_unset=True)
-        for field, value in update_dict.items():
-            update_fields.append(f"{field} = %s")
-            params.append(value)
-
-        if not update_fields:
+        if not fields:
             raise HTTPException(status_code=400, detail="No fields to update")
 
-        update_fields.append("updated_at = NOW()")
-        params.append(capacity_id)
+        params = [update_dict[field] for field in fields] + [capacity_id, vessel_id, org_id]
 
-        cursor.execute(f"""
-            UPDATE vessel_product_capacities
-            SET {', '.join(update_fields)}
-            WHERE id = %s
-        """, params)
+        # Only updates if the capacity belongs to a vessel in this org
+        cursor.execute(_capacity_update_sql(fields), params)
+
+        if not cursor.fetchone():
+            raise HTTPException(status_code=404, detail="Capacity not found")
 
         conn.commit()
+        _invalidate_org(org_id)
         return {"message": "Capacity updated successfully", "capacity_id": capacity_id}
 
 
@@ -362,6 +511,7 @@ def delete_vessel_capacity(
             raise HTTPException(status_code=404, detail="Capacity not found")
 
         conn.commit()
+        _invalidate_org(org_id)
         return {"message": "Capacity deleted successfully", "capacity_id": capacity_id}
 
 
@@ -375,61 +525,59 @@ def get_capacity_for_product(
     Get the capacity for a specific product in a vessel.
     Returns product-specific capacity if set, otherwise the vessel's default.
     """
+    org_id = current_user["organization_id"]
+    cache_key = (org_id, "capacity_for_product", vessel_id, common_product_id)
+    cached = _read_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     with get_db() as conn:
         cursor = conn.cursor()
-        org_id = current_user["organization_id"]
 
-        # Get vessel with its default capacity
-        cursor.execute("""
+        # Vessel default and any product-specific override in one query
+        execute_prepared(cursor, "vessels_capacity_for_product", """
             SELECT
-                v.id,
                 v.name,
                 v.default_capacity,
                 v.default_unit_id,
-                du.abbreviation as default_unit_abbr
+                vpc.id as capacity_id,
+                vpc.capacity,
+                vpc.unit_id,
+                cp.common_name as product_name
             FROM vessels v
-            LEFT JOIN units u ON u.id = v.default_unit_id
-            LEFT JOIN units du ON du.id = v.default_unit_id
-            WHERE v.id = %s AND v.organization_id = %s AND v.is_active = 1
-        """, (vessel_id, org_id))
+            LEFT JOIN vessel_product_capacities vpc ON vpc.vessel_id = v.id
+                AND vpc.common_product_id = $1
+            LEFT JOIN common_products cp ON cp.id = vpc.common_product_id
+            WHERE v.id = $2 AND v.organization_id = $3 AND v.is_active = 1
+        """, (common_product_id, vessel_id, org_id))
 
-        vessel = dict_from_row(cursor.fetchone())
+        vessel = cursor.fetchone()
         if not vessel:
             raise HTTPException(status_code=404, detail="Vessel not found")
 
-        # Check for product-specific capacity
-        cursor.execute("""
-            SELECT
-                vpc.capacity,
-                vpc.unit_id,
-                u.abbreviation as unit_abbr,
-                cp.common_name as product_name
-            FROM vessel_product_capacities vpc
-            JOIN common_products cp ON cp.id = vpc.common_product_id
-            LEFT JOIN units u ON u.id = vpc.unit_id
-            WHERE vpc.vessel_id = %s AND vpc.common_product_id = %s
-        """, (vessel_id, common_product_id))
-
-        product_capacity = dict_from_row(cursor.fetchone())
+        units = _unit_labels(cursor)
 
-        if product_capacity:
-            return {
+        if vessel["capacity_id"]:
+            result = {
                 "vessel_id": vessel_id,
                 "vessel_name": vessel["name"],
                 "common_product_id": common_product_id,
-                "product_name": product_capacity["product_name"],
-                "capacity": float(product_capacity["capacity"]),
-                "unit_id": product_capacity["unit_id"],
-                "unit_abbr": product_capacity["unit_abbr"],
+                "product_name": vessel["product_name"],
+                "capacity": vessel["capacity"],
+                "unit_id": vessel["unit_id"],
+                "unit_abbr": units.get(vessel["unit_id"], (None, None))[0],
                 "is_product_specific": True
             }
         else:
-            return {
+            result = {
                 "vessel_id": vessel_id,
                 "vessel_name": vessel["name"],
                 "common_product_id": common_product_id,
-                "capacity": float(vessel["default_capacity"]) if vessel["default_capacity"] else None,
+                "capacity": vessel["default_capacity"] or None,
                 "unit_id": vessel["default_unit_id"],
-                "unit_abbr": vessel["default_unit_abbr"],
+                "unit_abbr": units.get(vessel["default_unit_id"], (None, None))[0],
                 "is_product_specific": False
             }
+
+    _read_cache.set(cache_key, result)
+    return result
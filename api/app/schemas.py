@@ -1,6 +1,48 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, Field, TypeAdapter
+from typing import Literal, Optional, List, Union
 from datetime import datetime, date
+from enum import IntFlag
+
+
+# Allergens
+class Allergen(IntFlag):
+    """One bit per allergen/dietary flag, in ALLERGEN_FIELDS order."""
+    VEGAN = 1 << 0
+    VEGETARIAN = 1 << 1
+    GLUTEN = 1 << 2
+    CRUSTATION = 1 << 3
+    EGG = 1 << 4
+    MOLLUSK = 1 << 5
+    FISH = 1 << 6
+    LUPIN = 1 << 7
+    DAIRY = 1 << 8
+    TREE_NUTS = 1 << 9
+    PEANUTS = 1 << 10
+    SESAME = 1 << 11
+    SOY = 1 << 12
+    SULPHUR_DIOXIDE = 1 << 13
+    MUSTARD = 1 << 14
+    CELERY = 1 << 15
+
+
+# Column/field name for each flag, e.g. Allergen.TREE_NUTS -> 'allergen_tree_nuts'
+ALLERGEN_FIELDS = tuple(f"allergen_{flag.name.lower()}" for flag in Allergen)
+ALLERGEN_FIELD_SET = frozenset(ALLERGEN_FIELDS)
+ALLERGEN_BITS = tuple(zip(ALLERGEN_FIELDS, Allergen))
+
+
+def allergen_flags(values) -> int:
+    """Pack a mapping/row of allergen_* values into an Allergen bitmask."""
+    flags = 0
+    for field, bit in ALLERGEN_BITS:
+        if values.get(field):
+            flags |= bit
+    return flags
+
+
+def allergen_columns(flags: int) -> dict:
+    """Unpack an Allergen bitmask into allergen_* column values (0/1)."""
+    return {field: 1 if flags & bit else 0 for field, bit in ALLERGEN_BITS}
 
 
 # Common Products
@@ -28,6 +70,11 @@ class CommonProductBase(BaseModel):
     allergen_mustard: bool = False
     allergen_celery: bool = False
 
+    @property
+    def allergen_flags(self) -> int:
+        """Allergen flags packed into a single Allergen bitmask."""
+        return allergen_flags(self.__dict__)
+
 
 class CommonProductCreate(CommonProductBase):
     pass
@@ -246,6 +293,9 @@ class ProductMapping(BaseModel):
     product_id: int
     common_product_id: int
 
+    class Config:
+        defer_build = True
+
 
 # Distributors
 class Distributor(BaseModel):
@@ -254,6 +304,9 @@ class Distributor(BaseModel):
     code: str
     is_active: bool
 
+    class Config:
+        frozen = True
+
 
 # Units
 class Unit(BaseModel):
@@ -262,6 +315,9 @@ class Unit(BaseModel):
     abbreviation: str
     unit_type: str
 
+    class Config:
+        frozen = True
+
 
 # Recipes
 class RecipeIngredientBase(BaseModel):
@@ -293,6 +349,15 @@ class RecipeMethodStep(BaseModel):
     step_number: int
     instruction: str
 
+    class Config:
+        frozen = True
+
+
+# Serializes a method step list to the JSON text stored in recipes.method,
+# straight from pydantic-core without an intermediate list of dicts
+METHOD_STEPS_ADAPTER = TypeAdapter(List[RecipeMethodStep])
+
+
 class RecipeBase(BaseModel):
     name: str
     description: Optional[str] = None
@@ -355,12 +420,25 @@ class IngredientWithCost(BaseModel):
         from_attributes = True
 
 
+class AllergenByIngredient(BaseModel):
+    """Allergens contributed by one recipe ingredient."""
+    ingredient_id: int
+    name: Optional[str] = None
+    is_sub_recipe: bool = False
+    allergens: list[str] = []
+    vegan: bool = False
+    vegetarian: bool = False
+
+    class Config:
+        frozen = True
+
+
 class AllergenSummary(BaseModel):
     """Allergen summary for a recipe."""
     contains: list[str] = []
     vegan: bool = False
     vegetarian: bool = False
-    by_ingredient: list[dict] = []
+    by_ingredient: list[AllergenByIngredient] = []
 
 
 class RecipeWithCost(Recipe):
@@ -384,6 +462,7 @@ class PriceHistory(BaseModel):
 
     class Config:
         from_attributes = True
+        frozen = True
 
 
 # Organizations
@@ -453,39 +532,6 @@ class OutletResponse(OutletBase):
         from_attributes = True
 
 
-# Users
-class UserBase(BaseModel):
-    email: str
-    username: str
-    full_name: Optional[str] = None
-    role: str = 'viewer'
-
-
-class UserCreate(UserBase):
-    password: str
-    organization_id: int
-
-
-class UserUpdate(BaseModel):
-    email: Optional[str] = None
-    username: Optional[str] = None
-    full_name: Optional[str] = None
-    role: Optional[str] = None
-    is_active: Optional[int] = None
-
-
-class UserResponse(UserBase):
-    id: int
-    organization_id: int
-    organization_name: Optional[str] = None
-    organization_tier: Optional[str] = None
-    is_active: int
-    created_at: datetime
-    updated_at: datetime
-
-    class Config:
-        from_attributes = True
-
 # ============================================
 # AI Recipe Parser Schemas
 # ============================================
@@ -500,6 +546,9 @@ class ProductMatch(BaseModel):
     exact_match: bool
     match_type: str = Field(..., description="exact, contains_in_product, product_in_ingredient, fuzzy")
 
+    class Config:
+        frozen = True
+
 
 class ParsedIngredient(BaseModel):
     """Single ingredient parsed from recipe."""
@@ -519,19 +568,29 @@ class ParsedIngredient(BaseModel):
     auto_match_type: Optional[str] = Field(None, description="How the match was made: exact, fuzzy, semantic")
 
 
+# Built once at import: validates the parsed ingredients, with their nested
+# product matches, in a single pydantic-core call per parse
+PARSED_INGREDIENTS_ADAPTER = TypeAdapter(List[ParsedIngredient])
+
+
 class YieldInfo(BaseModel):
     """Recipe yield information."""
     quantity: float
     unit: str
     unit_id: Optional[int] = None
 
+    class Config:
+        frozen = True
+
 
 class UsageStats(BaseModel):
     """Monthly usage statistics."""
     tier: str
     used: int
-    limit: str | int  # Can be int or "unlimited"
-    remaining: str | int
+    # int, or "unlimited" for tiers without a cap. Tried left to right so the
+    # common int case never falls into smart-union matching.
+    limit: Union[int, Literal["unlimited"]] = Field(union_mode="left_to_right")
+    remaining: Union[int, Literal["unlimited"]] = Field(union_mode="left_to_right")
 
 
 class ParseHistoryItem(BaseModel):
@@ -547,7 +606,7 @@ class UsageStatsResponse(BaseModel):
     """Full usage statistics response."""
     organization_id: int
     tier: str
-    current_month: dict
+    current_month: UsageStats
     can_parse: bool
     recent_history: List[ParseHistoryItem]
 
@@ -636,12 +695,19 @@ class ProductSearchResult(BaseModel):
     category: Optional[str] = None
     subcategory: Optional[str] = None
 
+    class Config:
+        frozen = True
+        defer_build = True
+
 
 class ProductSearchResponse(BaseModel):
     """Product search results."""
     results: List[ProductSearchResult]
     count: int
 
+    class Config:
+        defer_build = True
+
 
 class ParseErrorResponse(BaseModel):
     """Error response from parsing."""
@@ -650,6 +716,9 @@ class ParseErrorResponse(BaseModel):
     credits_used: bool = False
     usage: Optional[UsageStats] = None
 
+    class Config:
+        defer_build = True
+
 
 class RateLimitErrorResponse(BaseModel):
     """Rate limit exceeded error."""
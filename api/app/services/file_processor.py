@@ -4,15 +4,41 @@ File processing service for AI recipe parser.
 Extracts text from uploaded documents (.docx, .doc, .pdf, .xlsx).
 """
 
-import io
-from typing import BinaryIO
+import asyncio
+import os
+import shutil
+import zipfile
+from typing import BinaryIO, Tuple
 from fastapi import UploadFile, HTTPException
 
+from ..config import EXCEL_MAX_EMPTY_ROWS
+
+# Parser libraries are imported once at module load (this module is imported
+# with the ai_parse router at startup), not on each request. Missing ones are
+# reported per format when a file of that type is uploaded.
+try:
+    from docx import Document
+except ImportError:
+    Document = None
+
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+try:
+    from openpyxl import load_workbook
+except ImportError:
+    load_workbook = None
+
 
 async def extract_text_from_file(file: UploadFile) -> str:
     """
     Extract text content from uploaded document.
 
+    Parses the upload's own spooled temp file (in memory up to 1MB, on disk
+    beyond that) rather than copying its content into a bytes buffer first.
+
     Supports:
     - .docx (Microsoft Word)
     - .doc (legacy Microsoft Word, via antiword)
@@ -32,25 +58,15 @@ async def extract_text_from_file(file: UploadFile) -> str:
     if not file.filename:
         raise HTTPException(status_code=400, detail="Filename is required")
 
-    filename_lower = file.filename.lower()
+    extractor = EXTRACTORS.get(os.path.splitext(file.filename)[1].lower())
+    if extractor is None:
+        raise HTTPException(status_code=400, detail=UNSUPPORTED_FORMAT_DETAIL)
 
     try:
-        # Read file content into memory
-        content = await file.read()
-
-        if filename_lower.endswith('.docx'):
-            return await extract_from_docx(io.BytesIO(content))
-        elif filename_lower.endswith('.doc'):
-            return await extract_from_doc(io.BytesIO(content))
-        elif filename_lower.endswith('.pdf'):
-            return await extract_from_pdf(io.BytesIO(content))
-        elif filename_lower.endswith('.xlsx'):
-            return await extract_from_excel(io.BytesIO(content))
-        else:
-            raise HTTPException(
-                status_code=400,
-                detail="Unsupported file format. Supported: .docx, .doc, .pdf, .xlsx"
-            )
+        await file.seek(0)
+        # The parsers are blocking and CPU-bound; run them in a worker thread
+        # so the event loop keeps serving requests.
+        return await asyncio.to_thread(extractor, file.file)
 
     except HTTPException:
         raise
@@ -61,7 +77,7 @@ async def extract_text_from_file(file: UploadFile) -> str:
         )
 
 
-async def extract_from_docx(file_content: BinaryIO) -> str:
+def extract_from_docx(file_content: BinaryIO) -> str:
     """
     Extract text from Word document (.docx).
 
@@ -72,9 +88,7 @@ async def extract_from_docx(file_content: BinaryIO) -> str:
         Plain text content
     """
 
-    try:
-        from docx import Document
-    except ImportError:
+    if Document is None:
         raise HTTPException(
             status_code=500,
             detail="python-docx not installed. Install with: pip install python-docx"
@@ -83,19 +97,14 @@ async def extract_from_docx(file_content: BinaryIO) -> str:
     try:
         doc = Document(file_content)
 
-        # Extract all paragraphs
-        paragraphs = [para.text for para in doc.paragraphs if para.text.strip()]
-
-        # Also extract text from tables
-        table_text = []
+        # Extract all paragraphs, then text from tables, into one list.
+        # .text is rebuilt from the XML on every access, so read it once.
+        all_text = [text for text in (para.text for para in doc.paragraphs) if text.strip()]
         for table in doc.tables:
             for row in table.rows:
-                row_text = [cell.text.strip() for cell in row.cells if cell.text.strip()]
+                row_text = [text for cell in row.cells if (text := cell.text.strip())]
                 if row_text:
-                    table_text.append(' | '.join(row_text))
-
-        # Combine paragraphs and tables
-        all_text = paragraphs + table_text
+                    all_text.append(' | '.join(row_text))
 
         if not all_text:
             raise HTTPException(
@@ -114,7 +123,7 @@ async def extract_from_docx(file_content: BinaryIO) -> str:
         )
 
 
-async def extract_from_doc(file_content: BinaryIO) -> str:
+def extract_from_doc(file_content: BinaryIO) -> str:
     """
     Extract text from legacy Word document (.doc) using antiword.
 
@@ -130,8 +139,6 @@ async def extract_from_doc(file_content: BinaryIO) -> str:
         Plain text content
     """
 
-    import os
-    import shutil
     import subprocess
     import tempfile
 
@@ -144,7 +151,7 @@ async def extract_from_doc(file_content: BinaryIO) -> str:
     tmp_path = None
     try:
         with tempfile.NamedTemporaryFile(suffix=".doc", delete=False) as tmp:
-            tmp.write(file_content.read())
+            shutil.copyfileobj(file_content, tmp, 64 * 1024)
             tmp_path = tmp.name
 
         result = subprocess.run(
@@ -186,7 +193,7 @@ async def extract_from_doc(file_content: BinaryIO) -> str:
             os.unlink(tmp_path)
 
 
-async def extract_from_pdf(file_content: BinaryIO) -> str:
+def extract_from_pdf(file_content: BinaryIO) -> str:
     """
     Extract text from PDF document.
 
@@ -200,9 +207,7 @@ async def extract_from_pdf(file_content: BinaryIO) -> str:
         Plain text content
     """
 
-    try:
-        from pypdf import PdfReader
-    except ImportError:
+    if PdfReader is None:
         raise HTTPException(
             status_code=500,
             detail="pypdf not installed. Install with: pip install pypdf"
@@ -212,19 +217,19 @@ async def extract_from_pdf(file_content: BinaryIO) -> str:
         reader = PdfReader(file_content)
 
         # Extract text from all pages
-        text_parts = []
-        for page in reader.pages:
-            page_text = page.extract_text()
-            if page_text.strip():
-                text_parts.append(page_text)
+        text = '\n\n'.join(
+            page_text
+            for page_text in (page.extract_text() or '' for page in reader.pages)
+            if page_text.strip()
+        )
 
-        if not text_parts:
+        if not text:
             raise HTTPException(
                 status_code=400,
                 detail="Could not extract text from PDF. This might be a scanned document (OCR support coming soon)"
             )
 
-        return '\n\n'.join(text_parts)
+        return text
 
     except Exception as e:
         if isinstance(e, HTTPException):
@@ -235,7 +240,7 @@ async def extract_from_pdf(file_content: BinaryIO) -> str:
         )
 
 
-async def extract_from_excel(file_content: BinaryIO) -> str:
+def extract_from_excel(file_content: BinaryIO) -> str:
     """
     Extract text from Excel spreadsheet (.xlsx).
 
@@ -250,16 +255,16 @@ async def extract_from_excel(file_content: BinaryIO) -> str:
         Plain text content with formatting preserved
     """
 
-    try:
-        from openpyxl import load_workbook
-    except ImportError:
+    if load_workbook is None:
         raise HTTPException(
             status_code=500,
             detail="openpyxl not installed. Install with: pip install openpyxl"
         )
 
     try:
-        workbook = load_workbook(file_content, data_only=True)
+        # read_only streams rows from the sheet XML instead of building
+        # every cell object up front
+        workbook = load_workbook(file_content, data_only=True, read_only=True, keep_links=False)
         sheet = workbook.active
 
         if not sheet:
@@ -268,13 +273,21 @@ async def extract_from_excel(file_content: BinaryIO) -> str:
                 detail="Excel file has no active sheet"
             )
 
-        # Extract all rows
+        # Extract all rows. Formatting can stretch a sheet far past its last
+        # value, so stop after a long run of empty rows.
         rows = []
+        empty_rows = 0
         for row in sheet.iter_rows(values_only=True):
             # Filter out empty cells and convert to strings
-            row_data = [str(cell).strip() for cell in row if cell is not None and str(cell).strip()]
+            row_data = [text for cell in row if cell is not None and (text := str(cell).strip())]
             if row_data:
                 rows.append(' | '.join(row_data))
+                empty_rows = 0
+            else:
+                empty_rows += 1
+                if empty_rows >= EXCEL_MAX_EMPTY_ROWS:
+                    break
+        workbook.close()
 
         if not rows:
             raise HTTPException(
@@ -293,17 +306,83 @@ async def extract_from_excel(file_content: BinaryIO) -> str:
         )
 
 
-async def validate_file_before_parse(file: UploadFile) -> dict:
+# Text extractor by lowercased file extension
+EXTRACTORS = {
+    '.docx': extract_from_docx,
+    '.doc': extract_from_doc,
+    '.pdf': extract_from_pdf,
+    '.xlsx': extract_from_excel,
+}
+UNSUPPORTED_FORMAT_DETAIL = "Unsupported file format. Supported: .docx, .doc, .pdf, .xlsx"
+
+# Leading bytes each format must start with. .docx/.xlsx are ZIP packages;
+# .doc is an OLE2 compound file.
+ZIP_MAGIC = b'PK\x03\x04'
+FILE_SIGNATURES = {
+    '.docx': ZIP_MAGIC,
+    '.xlsx': ZIP_MAGIC,
+    '.pdf': b'%PDF-',
+    '.doc': b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1',
+}
+# Part every package of that type contains, to tell .docx from .xlsx
+ZIP_MAIN_PARTS = {
+    '.docx': 'word/document.xml',
+    '.xlsx': 'xl/workbook.xml',
+}
+
+
+def check_file_signature(file_content: BinaryIO, ext: str) -> None:
+    """
+    Check that the file content matches its extension before parsing.
+
+    Compares the leading bytes against the format's signature and, for
+    ZIP-based formats, looks up the main part in the ZIP central directory
+    (read from the end of the file, without decompressing anything), so
+    corrupt or mislabelled uploads are rejected before a parser library
+    works through them.
+
+    Args:
+        file_content: File content as binary stream
+        ext: Lowercased file extension
+
+    Raises:
+        HTTPException: If the content doesn't match the extension
+    """
+
+    mismatch = HTTPException(
+        status_code=400,
+        detail=f"File content does not match its {ext} extension"
+    )
+
+    signature = FILE_SIGNATURES[ext]
+    file_content.seek(0)
+    if file_content.read(len(signature)) != signature:
+        raise mismatch
+
+    main_part = ZIP_MAIN_PARTS.get(ext)
+    if main_part is not None:
+        try:
+            with zipfile.ZipFile(file_content) as package:
+                package.getinfo(main_part)
+        except (zipfile.BadZipFile, KeyError):
+            raise mismatch
+
+    file_content.seek(0)
+
+
+async def validate_file_before_parse(file: UploadFile) -> Tuple[dict, str]:
     """
     Pre-validate file before sending to AI.
 
     This quick check prevents wasting credits on obviously invalid files.
+    The text extracted during validation is returned so the caller doesn't
+    have to parse the document a second time.
 
     Args:
         file: Uploaded file object
 
     Returns:
-        Dict with validation results
+        Tuple of (dict with validation results, extracted text)
 
     Raises:
         HTTPException: If file fails validation
@@ -313,16 +392,13 @@ async def validate_file_before_parse(file: UploadFile) -> dict:
         raise HTTPException(status_code=400, detail="Filename is required")
 
     # Check file extension
-    filename_lower = file.filename.lower()
-    if not any(filename_lower.endswith(ext) for ext in ['.docx', '.doc', '.pdf', '.xlsx']):
-        raise HTTPException(
-            status_code=400,
-            detail="Unsupported file format. Supported: .docx, .doc, .pdf, .xlsx"
-        )
+    ext = os.path.splitext(file.filename)[1].lower()
+    if ext not in EXTRACTORS:
+        raise HTTPException(status_code=400, detail=UNSUPPORTED_FORMAT_DETAIL)
 
-    # Check file size (10MB limit)
-    content = await file.read()
-    file_size = len(content)
+    # Check file size (10MB limit) without reading the content
+    file.file.seek(0, os.SEEK_END)
+    file_size = file.file.tell()
 
     if file_size > 10 * 1024 * 1024:  # 10MB
         raise HTTPException(
@@ -336,8 +412,8 @@ async def validate_file_before_parse(file: UploadFile) -> dict:
             detail="File is empty"
         )
 
-    # Reset file pointer for later reading
-    await file.seek(0)
+    # Check the content is really that format before handing it to a parser
+    check_file_signature(file.file, ext)
 
     # Try to extract text (quick validation)
     try:
@@ -350,9 +426,6 @@ async def validate_file_before_parse(file: UploadFile) -> dict:
                 detail="Document appears to have insufficient content for a recipe"
             )
 
-        # Reset file pointer again
-        await file.seek(0)
-
         return {
             'valid': True,
             'filename': file.filename,
@@ -360,7 +433,7 @@ async def validate_file_before_parse(file: UploadFile) -> dict:
             'size_mb': round(file_size / (1024 * 1024), 2),
             'text_length': len(text),
             'message': 'File is valid for parsing'
-        }
+        }, text
 
     except HTTPException:
         raise
@@ -12,6 +12,7 @@ Three-tier data security model:
 """
 
 from typing import Optional, Dict
+from ..database import execute_prepared
 from ..logger import get_logger
 
 logger = get_logger(__name__)
@@ -120,7 +121,8 @@ def get_learned_mapping(
     cursor = conn.cursor()
 
     try:
-        cursor.execute("""
+        # Prepared: runs once per ingredient of every recipe parse
+        execute_prepared(cursor, "ingredient_learned_mapping", """
             SELECT
                 im.id as mapping_id,
                 im.common_product_id,
@@ -131,8 +133,8 @@ def get_learned_mapping(
                 cp.subcategory
             FROM ingredient_mappings im
             JOIN common_products cp ON cp.id = im.common_product_id
-            WHERE im.organization_id = %s
-            AND LOWER(im.raw_name) = %s
+            WHERE im.organization_id = $1
+            AND LOWER(im.raw_name) = $2
             AND cp.is_active = 1
         """, (organization_id, normalized))
 
@@ -191,7 +193,8 @@ def get_shared_mapping(
     cursor = conn.cursor()
 
     try:
-        query = """
+        # Prepared, with a NULL exclude_org_id matching every organization
+        execute_prepared(cursor, "ingredient_shared_mapping", """
             SELECT
                 im.common_product_id,
                 cp.common_name,
@@ -199,23 +202,14 @@ def get_shared_mapping(
                 SUM(im.use_count) as total_uses
             FROM ingredient_mappings im
             JOIN common_products cp ON cp.id = im.common_product_id
-            WHERE LOWER(im.raw_name) = %s
+            WHERE LOWER(im.raw_name) = $1
             AND im.is_shared = TRUE
             AND cp.is_active = 1
-        """
-        params = [normalized]
-
-        if exclude_org_id:
-            query += " AND im.organization_id != %s"
-            params.append(exclude_org_id)
-
-        query += """
+            AND ($2::int IS NULL OR im.organization_id != $2)
             GROUP BY im.common_product_id, cp.common_name, cp.category
             ORDER BY total_uses DESC
             LIMIT 1
-        """
-
-        cursor.execute(query, params)
+        """, (normalized, exclude_org_id or None))
         result = cursor.fetchone()
 
         # Require multiple confirmations for shared mappings
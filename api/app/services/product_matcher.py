@@ -14,17 +14,54 @@ Matching strategies (in priority order):
 5. Shared mappings (cross-tenant, if no good match) - future network effect
 """
 
+import heapq
 import os
+import re
 from difflib import SequenceMatcher
+from operator import itemgetter
 from typing import List, Dict, Optional
 
+from ..config import READ_CACHE_TTL_SECONDS, READ_CACHE_MAX_ENTRIES
 from ..logger import get_logger
+from ..utils.cache import TTLCache
 
 logger = get_logger(__name__)
 
 # Check if semantic search is available
 SEMANTIC_SEARCH_ENABLED = bool(os.getenv("VOYAGE_API_KEY"))
 
+# Active common products by organization_id. A recipe parse matches every
+# ingredient against the same catalog, so it is fetched once instead of once
+# per ingredient; common product writes call invalidate_products_cache()
+_products_cache = TTLCache(maxsize=READ_CACHE_MAX_ENTRIES, ttl=READ_CACHE_TTL_SECONDS)
+
+
+def _load_products(organization_id: int, conn) -> list:
+    """
+    Return the organization's active common products, cached.
+
+    Each entry is (product row, lowercased name, base ingredient word); the
+    name normalization is done once per load rather than once per product
+    per ingredient matched.
+    """
+    def load():
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT id, common_name, category, subcategory
+            FROM common_products
+            WHERE organization_id = %s AND is_active = 1
+        """, (organization_id,))
+        return [
+            (product, product['common_name'].lower().strip(), get_base_ingredient(product['common_name']))
+            for product in cursor.fetchall()
+        ]
+    return _products_cache.get_or_set(organization_id, load)
+
+
+def invalidate_products_cache(organization_id: int) -> None:
+    """Forget an organization's cached products after a common product write."""
+    _products_cache.invalidate(lambda key: key == organization_id)
+
 
 def normalize_singular(word: str) -> str:
     """
@@ -173,6 +210,37 @@ def match_products(
     return matches
 
 
+def match_products_batch(
+    ingredient_names: List[str],
+    organization_id: int,
+    conn,
+    max_results: int = 3
+) -> List[List[Dict]]:
+    """
+    Match every ingredient of a parsed recipe in one call.
+
+    The organization's catalog is loaded once up front and ingredient names
+    that repeat within the recipe are only matched once.
+
+    Args:
+        ingredient_names: Parsed ingredient names, in recipe order
+        organization_id: Organization ID to scope search
+        conn: Database connection
+        max_results: Maximum number of matches per ingredient (default 3)
+
+    Returns:
+        One match_products() result list per ingredient name, same order
+    """
+    _load_products(organization_id, conn)
+
+    results = {}
+    for name in ingredient_names:
+        if name not in results:
+            results[name] = match_products(name, organization_id, conn, max_results)
+
+    return [results[name] for name in ingredient_names]
+
+
 def _get_algorithmic_matches(
     ingredient_name: str,
     organization_id: int,
@@ -185,37 +253,31 @@ def _get_algorithmic_matches(
     Separated from match_products() to allow learned mappings to wrap it.
     """
     # Get all common products for organization
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT id, common_name, category, subcategory
-        FROM common_products
-        WHERE organization_id = %s AND is_active = 1
-    """, (organization_id,))
-
-    products = cursor.fetchall()
+    products = _load_products(organization_id, conn)
 
     if not products:
         return []
 
-    matches = []
+    # (confidence, match_type, product) per hit; result dicts are only built
+    # for the ones that make the cut
+    scored = []
     ingredient_lower = ingredient_name.lower().strip()
     ingredient_base = get_base_ingredient(ingredient_name)
 
-    for product in products:
-        product_name_lower = product['common_name'].lower().strip()
-        product_base = get_base_ingredient(product['common_name'])
-
+    # The ingredient is seq1 and each product is set as seq2, matching the
+    # argument order the previous per-product SequenceMatcher used (ratio()
+    # is not symmetric). Reusing the object saves nothing by itself, since
+    # set_seq2 rebuilds the b2j index for every product; the saving comes
+    # from the length / quick_ratio / ratio pre-filter below. autojunk is
+    # off so long product names (200+ chars) don't have their common
+    # characters discarded as junk.
+    matcher = SequenceMatcher(None, ingredient_lower, autojunk=False)
+    ingredient_len = len(ingredient_lower)
+
+    for product, product_name_lower, product_base in products:
         # Strategy 1: Exact match (case-insensitive)
         if ingredient_lower == product_name_lower:
-            matches.append({
-                'common_product_id': product['id'],
-                'common_name': product['common_name'],
-                'category': product['category'],
-                'subcategory': product['subcategory'],
-                'confidence': 1.0,
-                'exact_match': True,
-                'match_type': 'exact'
-            })
+            scored.append((1.0, 'exact', product))
             continue
 
         # Strategy 1.5: Base word match (handles plurals and "Onion, White" format)
@@ -225,61 +287,52 @@ def _get_algorithmic_matches(
             # Prefer shorter names (simpler products) by boosting based on name length
             length_factor = min(1.0, 15 / len(product_name_lower))  # Boost shorter names
             confidence = 0.90 * length_factor  # Base 0.90, adjusted by length
-            matches.append({
-                'common_product_id': product['id'],
-                'common_name': product['common_name'],
-                'category': product['category'],
-                'subcategory': product['subcategory'],
-                'confidence': confidence,
-                'exact_match': False,
-                'match_type': 'base_match'
-            })
+            scored.append((confidence, 'base_match', product))
             continue
 
         # Strategy 2: Contains match
         # Check if ingredient is in product name or vice versa
         if ingredient_lower in product_name_lower:
             confidence = len(ingredient_lower) / len(product_name_lower)
-            matches.append({
-                'common_product_id': product['id'],
-                'common_name': product['common_name'],
-                'category': product['category'],
-                'subcategory': product['subcategory'],
-                'confidence': confidence,
-                'exact_match': False,
-                'match_type': 'contains_in_product'
-            })
+            scored.append((confidence, 'contains_in_product', product))
             continue
 
         if product_name_lower in ingredient_lower:
             confidence = len(product_name_lower) / len(ingredient_lower)
-            matches.append({
-                'common_product_id': product['id'],
-                'common_name': product['common_name'],
-                'category': product['category'],
-                'subcategory': product['subcategory'],
-                'confidence': confidence,
-                'exact_match': False,
-                'match_type': 'product_in_ingredient'
-            })
+            scored.append((confidence, 'product_in_ingredient', product))
             continue
 
         # Strategy 3: Fuzzy match (similarity score)
-        similarity = SequenceMatcher(None, ingredient_lower, product_name_lower).ratio()
-
-        if similarity > 0.7:  # Only consider if reasonably similar
-            matches.append({
-                'common_product_id': product['id'],
-                'common_name': product['common_name'],
-                'category': product['category'],
-                'subcategory': product['subcategory'],
-                'confidence': similarity,
-                'exact_match': False,
-                'match_type': 'fuzzy'
-            })
-
-    # Sort by confidence (highest first)
-    matches.sort(key=lambda x: x['confidence'], reverse=True)
+        # Names whose lengths differ too much can't reach 0.7: ratio() is at
+        # most 2 * shorter / (sum of lengths), the bound real_quick_ratio()
+        # computes. Check it inline before touching the matcher.
+        product_len = len(product_name_lower)
+        if 2.0 * min(ingredient_len, product_len) / (ingredient_len + product_len) <= 0.7:
+            continue
+
+        # quick_ratio() is a cheap upper bound on ratio(), so most remaining
+        # products are ruled out without the full matching-block computation
+        # (same pre-filter as get_close_matches)
+        matcher.set_seq2(product_name_lower)
+        if (
+            matcher.quick_ratio() > 0.7
+            and (similarity := matcher.ratio()) > 0.7  # Only consider if reasonably similar
+        ):
+            scored.append((similarity, 'fuzzy', product))
+
+    # Top matches by confidence (highest first; ties keep catalog order)
+    matches = [
+        {
+            'common_product_id': product['id'],
+            'common_name': product['common_name'],
+            'category': product['category'],
+            'subcategory': product['subcategory'],
+            'confidence': confidence,
+            'exact_match': match_type == 'exact',
+            'match_type': match_type
+        }
+        for confidence, match_type, product in heapq.nlargest(max_results, scored, key=itemgetter(0))
+    ]
 
     # Strategy 4: Semantic search fallback
     # If no good matches from string matching, try semantic search
@@ -288,17 +341,20 @@ def _get_algorithmic_matches(
             from ..utils.embeddings import search_similar_products
 
             semantic_results = search_similar_products(
-                cursor,
+                conn.cursor(),
                 query_text=ingredient_name,
                 organization_id=organization_id,
                 limit=max_results,
                 threshold=0.5  # Lower threshold for suggestions
             )
 
+            # Check against every string match, not just the top ones kept
+            seen_ids = {product['id'] for _, _, product in scored}
             for result in semantic_results:
                 # Check if already in matches (avoid duplicates)
-                if any(m['common_product_id'] == result['id'] for m in matches):
+                if result['id'] in seen_ids:
                     continue
+                seen_ids.add(result['id'])
 
                 matches.append({
                     'common_product_id': result['id'],
@@ -348,6 +404,12 @@ def get_best_match(
     return None
 
 
+# Must match the expression indexed by idx_common_products_fts
+_SEARCH_VECTOR_SQL = (
+    "to_tsvector('simple', common_name || ' ' || COALESCE(category, '') || ' ' || COALESCE(subcategory, ''))"
+)
+
+
 def search_products(
     search_term: str,
     organization_id: int,
@@ -371,34 +433,35 @@ def search_products(
 
     cursor = conn.cursor()
 
-    # Use PostgreSQL's ILIKE for case-insensitive search
-    cursor.execute("""
+    # Full-text match on the idx_common_products_fts expression (migration
+    # 052), plus a common_name substring match for partial words, served by
+    # idx_common_products_name_trgm (053)
+    cursor.execute(f"""
         SELECT
             id as common_product_id,
             common_name,
             category,
             subcategory
-        FROM common_products
+        FROM common_products, plainto_tsquery('simple', %s) AS query
         WHERE organization_id = %s
         AND is_active = 1
         AND (
-            common_name ILIKE %s
-            OR category ILIKE %s
-            OR subcategory ILIKE %s
+            {_SEARCH_VECTOR_SQL} @@ query
+            OR common_name ILIKE %s
         )
         ORDER BY
             CASE
                 WHEN common_name ILIKE %s THEN 1  -- Exact match first
                 WHEN common_name ILIKE %s THEN 2  -- Starts with
-                ELSE 3  -- Contains
+                ELSE 3  -- Word or substring match
             END,
+            ts_rank_cd({_SEARCH_VECTOR_SQL}, query) DESC,
             common_name
         LIMIT %s
     """, (
+        search_term,
         organization_id,
         f'%{search_term}%',
-        f'%{search_term}%',
-        f'%{search_term}%',
         search_term,
         f'{search_term}%',
         limit
@@ -407,6 +470,19 @@ def search_products(
     return cursor.fetchall()
 
 
+# Common prep terms that can be removed for better matching
+_PREP_TERMS = [
+    'chopped', 'diced', 'sliced', 'minced', 'julienned',
+    'peeled', 'seeded', 'crushed', 'grated', 'shredded',
+    'fresh', 'frozen', 'dried', 'canned', 'whole',
+    'halved', 'quartered', 'cubed', 'ground',
+    'raw', 'cooked', 'blanched', 'toasted'
+]
+
+# Any prep term standing as its own whitespace-separated word
+_PREP_TERMS_RE = re.compile(r'(?<!\S)(?:' + '|'.join(map(re.escape, _PREP_TERMS)) + r')(?!\S)')
+
+
 def analyze_ingredient_name(ingredient_name: str) -> Dict:
     """
     Analyze ingredient name to extract potential modifiers.
@@ -428,15 +504,6 @@ def analyze_ingredient_name(ingredient_name: str) -> Dict:
         }
     """
 
-    # Common prep terms that can be removed for better matching
-    prep_terms = [
-        'chopped', 'diced', 'sliced', 'minced', 'julienned',
-        'peeled', 'seeded', 'crushed', 'grated', 'shredded',
-        'fresh', 'frozen', 'dried', 'canned', 'whole',
-        'halved', 'quartered', 'cubed', 'ground',
-        'raw', 'cooked', 'blanched', 'toasted'
-    ]
-
     cleaned_name = ingredient_name.lower().strip()
     found_modifiers = []
 
@@ -457,10 +524,8 @@ def analyze_ingredient_name(ingredient_name: str) -> Dict:
         found_modifiers.append(prep_note)
 
     # Remove prep terms from name for better matching
-    for term in prep_terms:
-        if term in cleaned_name.split():
-            found_modifiers.append(term)
-            cleaned_name = cleaned_name.replace(term, '').strip()
+    found_modifiers.extend(dict.fromkeys(_PREP_TERMS_RE.findall(cleaned_name)))
+    cleaned_name = _PREP_TERMS_RE.sub('', cleaned_name)
 
     # Clean up double spaces
     cleaned_name = ' '.join(cleaned_name.split())
@@ -473,6 +538,26 @@ def analyze_ingredient_name(ingredient_name: str) -> Dict:
     }
 
 
+# Category suggestions based on common ingredients, checked in this order
+_CATEGORY_KEYWORDS = {
+    'Produce': ['lettuce', 'tomato', 'cucumber', 'onion', 'pepper', 'carrot',
+                'celery', 'spinach', 'kale', 'potato', 'garlic', 'herb'],
+    'Dairy': ['milk', 'cream', 'cheese', 'yogurt', 'butter', 'sour cream'],
+    'Meat': ['chicken', 'beef', 'pork', 'turkey', 'lamb', 'bacon', 'sausage'],
+    'Seafood': ['fish', 'salmon', 'tuna', 'shrimp', 'cod', 'crab', 'lobster'],
+    'Pantry': ['flour', 'sugar', 'salt', 'pepper', 'oil', 'vinegar', 'rice',
+               'pasta', 'sauce', 'spice', 'seasoning'],
+    'Bakery': ['bread', 'bun', 'roll', 'tortilla', 'pita'],
+}
+
+# One alternation per category, so a name is scanned once per category
+# instead of once per keyword
+_CATEGORY_PATTERNS = [
+    (category, re.compile('|'.join(map(re.escape, keywords))))
+    for category, keywords in _CATEGORY_KEYWORDS.items()
+]
+
+
 def create_product_suggestion(
     ingredient_name: str,
     category_hint: Optional[str] = None
@@ -502,23 +587,11 @@ def create_product_suggestion(
     cleaned = analyze_ingredient_name(ingredient_name)
     suggested_name = cleaned['cleaned_name'].title()
 
-    # Category suggestions based on common ingredients
-    category_keywords = {
-        'Produce': ['lettuce', 'tomato', 'cucumber', 'onion', 'pepper', 'carrot',
-                    'celery', 'spinach', 'kale', 'potato', 'garlic', 'herb'],
-        'Dairy': ['milk', 'cream', 'cheese', 'yogurt', 'butter', 'sour cream'],
-        'Meat': ['chicken', 'beef', 'pork', 'turkey', 'lamb', 'bacon', 'sausage'],
-        'Seafood': ['fish', 'salmon', 'tuna', 'shrimp', 'cod', 'crab', 'lobster'],
-        'Pantry': ['flour', 'sugar', 'salt', 'pepper', 'oil', 'vinegar', 'rice',
-                   'pasta', 'sauce', 'spice', 'seasoning'],
-        'Bakery': ['bread', 'bun', 'roll', 'tortilla', 'pita'],
-    }
-
     suggested_category = category_hint or 'Pantry'  # Default
     name_lower = suggested_name.lower()
 
-    for category, keywords in category_keywords.items():
-        if any(keyword in name_lower for keyword in keywords):
+    for category, keyword_pattern in _CATEGORY_PATTERNS:
+        if keyword_pattern.search(name_lower):
             suggested_category = category
             break
 
@@ -5,10 +5,27 @@ Extracts structured recipe data from unstructured text using AI.
 """
 
 import json
+import orjson
 import os
 from typing import Dict, Optional
 from fastapi import HTTPException
 
+try:
+    import anthropic
+except ImportError:
+    anthropic = None
+
+# Shared Claude client, so parses reuse its HTTP connection pool
+_client = None
+
+
+def get_claude_client(api_key: str):
+    """Get or create the shared AsyncAnthropic client instance."""
+    global _client
+    if _client is None:
+        _client = anthropic.AsyncAnthropic(api_key=api_key)
+    return _client
+
 
 async def parse_recipe_with_claude(text: str) -> Dict:
     """
@@ -39,9 +56,7 @@ async def parse_recipe_with_claude(text: str) -> Dict:
             detail="AI parsing not configured. ANTHROPIC_API_KEY environment variable required."
         )
 
-    try:
-        import anthropic
-    except ImportError:
+    if anthropic is None:
         raise HTTPException(
             status_code=500,
             detail="Anthropic package not installed. Install with: pip install anthropic"
@@ -51,30 +66,29 @@ async def parse_recipe_with_claude(text: str) -> Dict:
     prompt = build_recipe_parsing_prompt(text)
 
     try:
-        # Initialize Claude client
-        client = anthropic.Anthropic(api_key=api_key)
+        client = get_claude_client(api_key)
 
-        # Call Claude API
+        # Call Claude API, streaming the response text as it is generated
         print(f"[CLAUDE] Calling API with {len(text)} chars of text")
-        message = client.messages.create(
+        async with client.messages.stream(
             model="claude-sonnet-4-5-20250929",
             max_tokens=4000,
             temperature=0,  # Deterministic for structured extraction
             messages=[
                 {"role": "user", "content": prompt}
             ]
-        )
+        ) as stream:
+            response_text = ''.join([chunk async for chunk in stream.text_stream])
+            message = await stream.get_final_message()
         print(f"[CLAUDE] API call successful, stop_reason: {message.stop_reason}")
 
-        # Extract response text
-        if not message.content or len(message.content) == 0:
+        # Check response text
+        if not message.content or not response_text:
             raise HTTPException(
                 status_code=500,
                 detail="AI returned empty response"
             )
 
-        response_text = message.content[0].text
-
         # Log the response for debugging
         print(f"[CLAUDE] Raw response length: {len(response_text)}")
         print(f"[CLAUDE] Raw response (first 500 chars): {response_text[:500]}")
@@ -98,15 +112,20 @@ async def parse_recipe_with_claude(text: str) -> Dict:
             print(f"[CLAUDE] Extracted JSON (first 200 chars): {response_text[:200]}")
 
         try:
-            recipe_data = json.loads(response_text)
-            print(f"[CLAUDE] Successfully parsed JSON with {len(recipe_data.get('ingredients', []))} ingredients")
-        except json.JSONDecodeError as e:
-            print(f"[CLAUDE ERROR] Failed to parse JSON. Error: {str(e)}")
-            print(f"[CLAUDE ERROR] Full response: {response_text}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"AI returned invalid JSON: {str(e)}"
-            )
+            recipe_data = orjson.loads(response_text)
+        except orjson.JSONDecodeError as e:
+            # Claude sometimes adds prose around the JSON; fall back to the
+            # first complete object in the text
+            recipe_data = extract_json_object(response_text)
+            if recipe_data is None:
+                print(f"[CLAUDE ERROR] Failed to parse JSON. Error: {str(e)}")
+                print(f"[CLAUDE ERROR] Full response: {response_text}")
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"AI returned invalid JSON: {str(e)}"
+                )
+            print("[CLAUDE] Extracted JSON object from surrounding text")
+        print(f"[CLAUDE] Successfully parsed JSON with {len(recipe_data.get('ingredients', []))} ingredients")
 
         # Validate structure
         validate_recipe_data(recipe_data)
@@ -118,7 +137,7 @@ async def parse_recipe_with_claude(text: str) -> Dict:
             status_code=503,
             detail=f"AI service temporarily unavailable: {str(e)}"
         )
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         raise HTTPException(
             status_code=500,
             detail=f"AI returned invalid response format: {str(e)}"
@@ -130,6 +149,36 @@ async def parse_recipe_with_claude(text: str) -> Dict:
         )
 
 
+_json_decoder = json.JSONDecoder()
+
+
+def extract_json_object(text: str) -> Optional[Dict]:
+    """
+    Decode the first JSON object embedded in text.
+
+    The object usually runs from the first '{' to the last '}', so that
+    slice is tried with orjson first. Otherwise decoding starts at the
+    first '{' and stops where that object ends, ignoring anything after it.
+
+    Args:
+        text: Model response that may wrap the JSON in other text
+
+    Returns:
+        The decoded object, or None if there is no valid object
+    """
+    start = text.find('{')
+    if start == -1:
+        return None
+    try:
+        data = orjson.loads(text[start:text.rfind('}') + 1])
+    except orjson.JSONDecodeError:
+        try:
+            data, _ = _json_decoder.raw_decode(text, start)
+        except json.JSONDecodeError:
+            return None
+    return data if isinstance(data, dict) else None
+
+
 def build_recipe_parsing_prompt(text: str) -> str:
     """
     Build optimized prompt for Claude to extract recipe data.
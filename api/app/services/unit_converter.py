@@ -6,9 +6,44 @@ Does NOT convert quantities - conversions happen at calculation time
 using the base_conversions and product_conversions tables.
 """
 
+from functools import lru_cache
 from typing import Tuple, Optional
 
+from ..config import UNITS_CACHE_TTL_SECONDS
+from ..utils.cache import TTLCache
 
+
+# Lowercased unit spellings -> standard abbreviation
+UNIT_ALIASES = {
+    # Volume units
+    'gallon': 'GAL', 'gal': 'GAL',
+    'quart': 'QT', 'qt': 'QT',
+    'pint': 'PT', 'pt': 'PT',
+    'cup': 'CUP', 'c': 'CUP',
+    'fluid ounce': 'FL OZ', 'fl oz': 'FL OZ', 'fl. oz': 'FL OZ',
+    'tablespoon': 'TBSP', 'tbsp': 'TBSP',
+    'teaspoon': 'TSP', 'tsp': 'TSP',
+
+    # Weight units
+    'pound': 'LB', 'lb': 'LB', 'lbs': 'LB',
+    'ounce': 'OZ', 'oz': 'OZ',
+    'kilogram': 'KG', 'kg': 'KG',
+    'gram': 'G', 'g': 'G',
+
+    # Count units
+    'each': 'EA', 'ea': 'EA', 'piece': 'EA', 'pc': 'EA',
+    'item': 'EA', 'unit': 'EA', 'whole': 'EA',
+}
+
+
+# Unit ids by uppercased abbreviation; a recipe parse looks one up per
+# ingredient, so the whole (small) units table is held instead
+_unit_ids_cache = TTLCache(maxsize=1, ttl=UNITS_CACHE_TTL_SECONDS)
+
+
+# Recipes repeat a handful of unit spellings, so the normalized form of each
+# raw string is kept rather than re-lowercased per ingredient
+@lru_cache(maxsize=512)
 def normalize_unit_string(unit: str) -> str:
     """
     Normalize unit string to standard abbreviation.
@@ -19,40 +54,8 @@ def normalize_unit_string(unit: str) -> str:
     Returns:
         Normalized unit abbreviation
     """
-    unit_lower = unit.lower().strip()
-
-    # Volume units
-    if unit_lower in ['gallon', 'gal']:
-        return 'GAL'
-    elif unit_lower in ['quart', 'qt']:
-        return 'QT'
-    elif unit_lower in ['pint', 'pt']:
-        return 'PT'
-    elif unit_lower in ['cup', 'c']:
-        return 'CUP'
-    elif unit_lower in ['fluid ounce', 'fl oz', 'fl. oz']:
-        return 'FL OZ'
-    elif unit_lower in ['tablespoon', 'tbsp']:
-        return 'TBSP'
-    elif unit_lower in ['teaspoon', 'tsp']:
-        return 'TSP'
-
-    # Weight units
-    elif unit_lower in ['pound', 'lb', 'lbs']:
-        return 'LB'
-    elif unit_lower in ['ounce', 'oz']:
-        return 'OZ'
-    elif unit_lower in ['kilogram', 'kg']:
-        return 'KG'
-    elif unit_lower in ['gram', 'g']:
-        return 'G'
-
-    # Count units
-    elif unit_lower in ['each', 'ea', 'piece', 'pc', 'item', 'unit', 'whole']:
-        return 'EA'
-
     # Return as-is if unknown (let user review)
-    return unit.upper()
+    return UNIT_ALIASES.get(unit.lower().strip(), unit.upper())
 
 
 def normalize_quantity(
@@ -90,7 +93,7 @@ def normalize_quantity(
 
 def get_unit_id_by_abbreviation(abbreviation: str, conn) -> Optional[int]:
     """
-    Look up unit ID by abbreviation from database.
+    Look up unit ID by abbreviation.
 
     Args:
         abbreviation: Unit abbreviation (e.g., 'OZ', 'LB', 'EA')
@@ -99,16 +102,16 @@ def get_unit_id_by_abbreviation(abbreviation: str, conn) -> Optional[int]:
     Returns:
         Unit ID or None if not found
     """
-
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT id
-        FROM units
-        WHERE UPPER(abbreviation) = UPPER(%s)
-        LIMIT 1
-    """, (abbreviation,))
-
-    result = cursor.fetchone()
-    return result['id'] if result else None
-
-
+    return _unit_ids(conn).get(abbreviation.upper())
+
+
+def _unit_ids(conn) -> dict:
+    """Return {UPPER(abbreviation): unit_id} for every unit."""
+    def load():
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, UPPER(abbreviation) AS abbreviation FROM units ORDER BY id")
+        unit_ids = {}
+        for row in cursor.fetchall():
+            unit_ids.setdefault(row['abbreviation'], row['id'])
+        return unit_ids
+    return _unit_ids_cache.get_or_set("units", load)
@@ -0,0 +1,69 @@
+"""In-process TTL Cache
+
+Small thread-safe LRU cache with per-entry expiry, for read-mostly data
+that can tolerate being a few seconds stale (reference lists, per-org
+lookups). Each worker process has its own copy, so writers should call
+invalidate() for the keys they touch.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    LRU cache whose entries expire `ttl` seconds after being stored.
+
+    Args:
+        maxsize: Maximum number of entries; least recently used are evicted
+        ttl: Seconds an entry stays valid
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing/expired."""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            expires_at, value = entry
+            if time.monotonic() >= expires_at:
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store value under key, evicting the oldest entry if full."""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_set(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return the cached value for key, calling loader() to fill a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = loader()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, match: Callable[[Hashable], bool] = None) -> None:
+        """Drop entries whose key satisfies match, or everything if None."""
+        with self._lock:
+            if match is None:
+                self._data.clear()
+                return
+            for key in [k for k in self._data if match(k)]:
+                del self._data[key]
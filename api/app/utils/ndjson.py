@@ -0,0 +1,68 @@
+"""
+NDJSON streaming responses.
+
+Lets list endpoints stream rows one JSON object per line when the client
+sends `Accept: application/x-ndjson`, instead of building the whole array.
+"""
+from typing import Callable, Optional
+
+import orjson
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+from ..database import get_db
+from .responses import json_default
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NDJSON_BATCH_SIZE = 1000
+
+
+def wants_ndjson(request: Optional[Request]) -> bool:
+    """True if the client asked for a streamed NDJSON response."""
+    return request is not None and NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def ndjson_response(
+    execute: Callable,
+    server_side: bool = False,
+    transform: Optional[Callable] = None,
+    header: Optional[Callable] = None
+) -> StreamingResponse:
+    """
+    Stream query rows as NDJSON, one JSON object per line.
+
+    Rows are pulled NDJSON_BATCH_SIZE at a time and serialized as they go,
+    so the full result set is never materialized as one response body.
+
+    Args:
+        execute: Callable taking a cursor and executing the query on it
+        server_side: Use a named (server-side) cursor so rows are also
+            fetched from Postgres in batches. Not usable with
+            execute_prepared, since EXECUTE cannot back a cursor.
+        transform: Optional callable applied to each row before it is
+            serialized
+        header: Optional callable given the first row (None if there are
+            no rows); the dict it returns is written as the first line
+    """
+    def generate():
+        with get_db() as conn:
+            if server_side:
+                cursor = conn.cursor(name="ndjson_stream")
+                cursor.itersize = NDJSON_BATCH_SIZE
+            else:
+                cursor = conn.cursor()
+            execute(cursor)
+            rows = cursor.fetchmany(NDJSON_BATCH_SIZE)
+            if header is not None:
+                yield orjson.dumps(header(rows[0] if rows else None), default=json_default) + b"\n"
+            while rows:
+                for row in rows:
+                    if transform is not None:
+                        row = transform(row)
+                    yield orjson.dumps(row, default=json_default) + b"\n"
+                rows = cursor.fetchmany(NDJSON_BATCH_SIZE)
+            cursor.close()
+
+    return StreamingResponse(generate(), media_type=NDJSON_MEDIA_TYPE)
@@ -0,0 +1,37 @@
+"""
+orjson-backed JSON responses.
+
+FastAPI runs a plain dict/list return value through jsonable_encoder before
+the response class sees it, and that walk dominates serialization time for
+large lists. Endpoints that return ORJSONResponse(...) themselves skip it:
+orjson encodes datetimes natively and json_default covers DB Decimals.
+
+Endpoints with a response_model are left alone - FastAPI serializes those
+straight to JSON bytes through pydantic-core, which is already fast.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+def json_default(value):
+    """JSON fallback for DB types (timestamps, numerics)."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson, accepting raw DB rows as content."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=json_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
@@ -9,6 +9,51 @@ Credit Protection Policy:
 
 from typing import Optional
 
+from ..config import READ_CACHE_TTL_SECONDS, READ_CACHE_MAX_ENTRIES
+from .cache import TTLCache
+
+
+# subscription_tier by organization_id. Tiers only change through the
+# organization update endpoints, which call invalidate_tier_cache(). Usage
+# counts are never cached: they move with every parse.
+_tier_cache = TTLCache(maxsize=READ_CACHE_MAX_ENTRIES, ttl=READ_CACHE_TTL_SECONDS)
+
+
+def invalidate_tier_cache(organization_id: int) -> None:
+    """Forget an organization's cached tier after its subscription changes."""
+    _tier_cache.invalidate(lambda key: key == organization_id)
+
+
+def get_subscription_tier(organization_id: int, conn) -> str:
+    """
+    Get an organization's subscription tier, cached.
+
+    Raises:
+        ValueError: If the organization does not exist
+    """
+    def load():
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT subscription_tier
+            FROM organizations
+            WHERE id = %s
+        """, (organization_id,))
+
+        org = cursor.fetchone()
+        if not org:
+            raise ValueError(f"Organization {organization_id} not found")
+        return org['subscription_tier']
+    return _tier_cache.get_or_set(organization_id, load)
+
+
+# Monthly AI parse limit by subscription tier
+MONTHLY_PARSE_LIMITS = {
+    'free': 10,
+    'basic': 100,
+    'pro': 100,
+    'enterprise': None  # Unlimited
+}
+
 
 def get_monthly_parse_limit(tier: str) -> Optional[int]:
     """
@@ -20,13 +65,7 @@ def get_monthly_parse_limit(tier: str) -> Optional[int]:
     Returns:
         Monthly limit or None for unlimited
     """
-    limits = {
-        'free': 10,
-        'basic': 100,
-        'pro': 100,
-        'enterprise': None  # Unlimited
-    }
-    return limits.get(tier, 10)  # Default to free tier
+    return MONTHLY_PARSE_LIMITS.get(tier, 10)  # Default to free tier
 
 
 def check_parse_limit(organization_id: int, conn) -> tuple[bool, dict]:
@@ -47,21 +86,11 @@ def check_parse_limit(organization_id: int, conn) -> tuple[bool, dict]:
     """
 
     # Get organization tier
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT subscription_tier
-        FROM organizations
-        WHERE id = %s
-    """, (organization_id,))
-
-    org = cursor.fetchone()
-    if not org:
-        raise ValueError(f"Organization {organization_id} not found")
-
-    tier = org['subscription_tier']
+    tier = get_subscription_tier(organization_id, conn)
     limit = get_monthly_parse_limit(tier)
 
     # Count this month's usage (only successful/partial parses)
+    cursor = conn.cursor()
     cursor.execute("""
         SELECT COUNT(*) as used
         FROM ai_parse_usage
@@ -83,6 +112,10 @@ def check_parse_limit(organization_id: int, conn) -> tuple[bool, dict]:
     }
 
 
+# Parse attempts (any status) allowed per organization per hour
+HOURLY_ATTEMPT_LIMIT = 10
+
+
 def check_rate_limit(organization_id: int, conn) -> tuple[bool, int]:
     """
     Check if organization has exceeded hourly upload rate limit.
@@ -97,19 +130,24 @@ def check_rate_limit(organization_id: int, conn) -> tuple[bool, int]:
     Returns:
         (within_limit, attempts_count)
         - within_limit: True if under 10 attempts/hour
-        - attempts_count: Number of attempts in last hour
+        - attempts_count: Number of attempts in last hour, capped at the limit
     """
 
+    # Only whether the limit is reached matters, so stop reading rows there
     cursor = conn.cursor()
     cursor.execute("""
         SELECT COUNT(*) as attempts
-        FROM ai_parse_usage
-        WHERE organization_id = %s
-        AND created_at > NOW() - INTERVAL '1 hour'
-    """, (organization_id,))
+        FROM (
+            SELECT 1
+            FROM ai_parse_usage
+            WHERE organization_id = %s
+            AND created_at > NOW() - INTERVAL '1 hour'
+            LIMIT %s
+        ) recent
+    """, (organization_id, HOURLY_ATTEMPT_LIMIT))
 
     attempts = cursor.fetchone()['attempts']
-    return attempts < 10, attempts
+    return attempts < HOURLY_ATTEMPT_LIMIT, attempts
 
 
 def log_parse_attempt(